@@ -0,0 +1,452 @@
+"""
+Copyright (C) 2025  Brenno Flávio de Almeida
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; version 3.
+
+ut-components is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import asyncio
+import email.parser
+import http.client
+import ssl
+import time
+import urllib.parse
+from typing import Awaitable, Dict, List, Optional, Tuple, TypeVar
+
+from .http import (
+    _DEFAULT_PORTS,
+    _REDIRECT_STATUSES,
+    _USER_AGENT,
+    Response,
+    _content_decoder,
+    _get_ssl_context,
+    _json_request,
+    _merge_headers,
+    _redirect_request,
+    _with_params,
+)
+
+T = TypeVar("T")
+
+_MAX_LINE_BYTES = 65536
+_MAX_HEADERS = 100
+
+
+class _AsyncConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.released_at = 0.0
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncConnectionPool:
+    """
+    Per-host pool of persistent HTTP and HTTPS connections for asyncio.
+
+    The asyncio counterpart of http.ConnectionPool. Connections are kept open
+    after a response has been read completely and reused by the next request
+    to the same scheme, host and port. The module functions use a shared
+    default pool.
+
+    A pool belongs to the event loop that used it last. When it is used from
+    another loop, for example after a second asyncio.run(), the connections of
+    the previous loop are dropped.
+
+    Attributes:
+        max_connections_per_host (int): Maximum number of connections in use
+            per host. Requests over the limit wait for a connection.
+        idle_timeout_seconds (float): Idle connections older than this are
+            closed instead of reused, since servers drop them on their side.
+
+    Example:
+        >>> from src.ut_components.async_http import AsyncConnectionPool, get
+        >>>
+        >>> pool = AsyncConnectionPool(max_connections_per_host=4)
+        >>> response = await get("https://api.example.com/status", pool=pool)
+        >>> pool.close()
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 8,
+        idle_timeout_seconds: float = 30,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ) -> None:
+        """
+        Initialize an empty pool.
+
+        Args:
+            max_connections_per_host (int): Maximum number of connections in
+                use per host. Defaults to 8.
+            idle_timeout_seconds (float): How long a released connection may
+                stay idle before it is closed instead of reused. Defaults to 30.
+            ssl_context (Optional[ssl.SSLContext]): Context for HTTPS
+                connections. Defaults to a shared context with the system CAs.
+
+        Raises:
+            ValueError: If max_connections_per_host is below 1.
+        """
+        if max_connections_per_host < 1:
+            raise ValueError("max_connections_per_host must be at least 1")
+        self.max_connections_per_host = max_connections_per_host
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self._ssl_context = ssl_context
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle: Dict[Tuple[str, str, int], List[_AsyncConnection]] = {}
+        self._slots: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+
+    async def _acquire(
+        self, scheme: str, host: str, port: int, timeout: Optional[float]
+    ) -> Tuple[_AsyncConnection, bool]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Streams and semaphores are bound to the loop that created them.
+            self._loop = loop
+            self._idle = {}
+            self._slots = {}
+        origin = (scheme, host, port)
+        slots = self._slots.setdefault(origin, asyncio.Semaphore(self.max_connections_per_host))
+        await slots.acquire()
+        try:
+            idle = self._idle.get(origin)
+            now = time.monotonic()
+            while idle:
+                connection = idle.pop()
+                if now - connection.released_at < self.idle_timeout_seconds:
+                    return connection, True
+                connection.close()
+            ssl_context = (self._ssl_context or _get_ssl_context()) if scheme == "https" else None
+            reader, writer = await _wait(
+                asyncio.open_connection(host, port, ssl=ssl_context, limit=_MAX_LINE_BYTES), timeout
+            )
+            return _AsyncConnection(reader, writer), False
+        except BaseException:
+            slots.release()
+            raise
+
+    def _release(self, scheme: str, host: str, port: int, connection: _AsyncConnection, reusable: bool = True) -> None:
+        origin = (scheme, host, port)
+        if reusable and asyncio.get_running_loop() is self._loop:
+            connection.released_at = time.monotonic()
+            self._idle.setdefault(origin, []).append(connection)
+        else:
+            connection.close()
+        slots = self._slots.get(origin)
+        if slots is not None and asyncio.get_running_loop() is self._loop:
+            slots.release()
+
+    def close(self) -> None:
+        """
+        Close all idle connections.
+        """
+        for idle in self._idle.values():
+            for connection in idle:
+                connection.close()
+        self._idle.clear()
+
+
+_DEFAULT_POOL = AsyncConnectionPool()
+
+
+async def request(
+    url: str,
+    method: str,
+    data: Optional[bytes] = None,
+    headers: Optional[Dict[str, str]] = None,
+    follow_redirects: bool = True,
+    max_redirects: int = 10,
+    timeout: Optional[float] = 30,
+    pool: Optional[AsyncConnectionPool] = None,
+) -> Response:
+    """
+    Perform an HTTP request without blocking the event loop.
+
+    The asyncio counterpart of http.request(), following redirects with the
+    same rules and returning the same Response class. Requests run on the
+    event loop instead of one thread each, so thousands of them can be in
+    flight at once.
+
+    Args:
+        url (str): The target URL for the request.
+        method (str): HTTP method (GET, POST, PUT, DELETE, PATCH, etc.).
+        data (Optional[bytes]): Request body as bytes. Defaults to None.
+        headers (Optional[Dict[str, str]]): HTTP headers to include in the request.
+            Defaults to None.
+        follow_redirects (bool): Whether to automatically follow HTTP redirects.
+            Defaults to True.
+        max_redirects (int): Maximum number of redirects to follow before failing.
+            Defaults to 10.
+        timeout (Optional[float]): Seconds to wait for the connection and for
+            each read from it. None waits forever. Defaults to 30.
+        pool (Optional[AsyncConnectionPool]): Connections to use. Defaults to
+            a shared pool.
+
+    Returns:
+        Response: A Response object containing the result of the HTTP request.
+
+    Example:
+        >>> import asyncio
+        >>> from src.ut_components.async_http import request
+        >>>
+        >>> async def main():
+        ...     return await request("https://api.example.com/resource/123", "PATCH", data=b'{"status": "done"}')
+        >>>
+        >>> response = asyncio.run(main())
+    """
+    pool = pool or _DEFAULT_POOL
+    current_url = url
+    current_method = method
+    current_data = data
+    current_headers = headers
+
+    for _ in range(max_redirects):
+        try:
+            status, response_headers, body = await _send(
+                pool, current_method, current_url, current_data, current_headers, timeout
+            )
+        except asyncio.TimeoutError:
+            return Response(url=current_url, success=False, status_code=0, data=b"Request timed out")
+        except Exception as e:
+            return Response(url=current_url, success=False, status_code=0, data=str(e).encode())
+
+        if follow_redirects and status in _REDIRECT_STATUSES:
+            location = response_headers.get("Location")
+            if not location:
+                return Response(current_url, False, status, body, response_headers)
+            current_url = urllib.parse.urljoin(current_url, location)
+            current_method, current_data, current_headers = _redirect_request(
+                status, current_method, current_data, current_headers
+            )
+            continue
+
+        return Response(current_url, 200 <= status < 300, status, body, response_headers)
+
+    return Response(url=current_url, success=False, status_code=0, data=b"Maximum redirects exceeded")
+
+
+async def get(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = 30,
+    pool: Optional[AsyncConnectionPool] = None,
+) -> Response:
+    """
+    Perform an HTTP GET request, see http.get().
+
+    Example:
+        >>> async def load_albums(ids):
+        ...     responses = await asyncio.gather(*(get(f"https://api.example.com/albums/{id}") for id in ids))
+        ...     return [response.json() for response in responses if response.success]
+    """
+    return await request(_with_params(url, params), "GET", headers=headers, timeout=timeout, pool=pool)
+
+
+async def post(
+    url: str,
+    json: Optional[Dict] = None,
+    headers: Optional[Dict[str, str]] = None,
+    compress: bool = False,
+    timeout: Optional[float] = 30,
+    pool: Optional[AsyncConnectionPool] = None,
+) -> Response:
+    """
+    Perform an HTTP POST request with an optional JSON body, see http.post().
+    """
+    data, request_headers = _json_request(json, headers, compress)
+    return await request(url, "POST", data=data, headers=request_headers, timeout=timeout, pool=pool)
+
+
+async def put(
+    url: str,
+    json: Optional[Dict] = None,
+    headers: Optional[Dict[str, str]] = None,
+    compress: bool = False,
+    timeout: Optional[float] = 30,
+    pool: Optional[AsyncConnectionPool] = None,
+) -> Response:
+    """
+    Perform an HTTP PUT request with an optional JSON body, see http.put().
+    """
+    data, request_headers = _json_request(json, headers, compress)
+    return await request(url, "PUT", data=data, headers=request_headers, timeout=timeout, pool=pool)
+
+
+async def delete(
+    url: str,
+    json: Optional[Dict] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = 30,
+    pool: Optional[AsyncConnectionPool] = None,
+) -> Response:
+    """
+    Perform an HTTP DELETE request with an optional JSON body, see http.delete().
+    """
+    data, request_headers = _json_request(json, headers)
+    return await request(url, "DELETE", data=data, headers=request_headers, timeout=timeout, pool=pool)
+
+
+async def _wait(awaitable: Awaitable[T], timeout: Optional[float]) -> T:
+    return await asyncio.wait_for(awaitable, timeout)
+
+
+def _request_head(method: str, target: str, headers: Dict[str, str]) -> bytes:
+    # The same checks as http.client: a CR or LF in any part of the head would
+    # let a caller supplied value inject headers or a whole second request.
+    if http.client._contains_disallowed_method_pchar_re.search(method):
+        raise ValueError(f"method can't contain control characters: {method!r}")
+    if http.client._contains_disallowed_url_pchar_re.search(target):
+        raise ValueError(f"URL can't contain control characters: {target!r}")
+    lines = [f"{method} {target} HTTP/1.1\r\n".encode("ascii")]
+    for name, value in headers.items():
+        encoded_name = name.encode("ascii")
+        if not http.client._is_legal_header_name(encoded_name):
+            raise ValueError(f"Invalid header name {encoded_name!r}")
+        encoded_value = str(value).encode("latin-1")
+        if http.client._is_illegal_header_value(encoded_value):
+            raise ValueError(f"Invalid header value {encoded_value!r}")
+        lines.append(encoded_name + b": " + encoded_value + b"\r\n")
+    lines.append(b"\r\n")
+    return b"".join(lines)
+
+
+async def _send(
+    pool: AsyncConnectionPool,
+    method: str,
+    url: str,
+    data: Optional[bytes],
+    headers: Optional[Dict[str, str]],
+    timeout: Optional[float],
+) -> Tuple[int, http.client.HTTPMessage, bytes]:
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        raise ValueError(f"unsupported url: {url}")
+    host = parts.hostname
+    port = parts.port or _DEFAULT_PORTS[scheme]
+
+    request_headers = {
+        "Host": parts.netloc.rpartition("@")[2],
+        "User-Agent": _USER_AGENT,
+        "Accept-Encoding": "gzip, deflate",
+    }
+    if data is not None:
+        request_headers["Content-Type"] = "application/x-www-form-urlencoded"
+    if data is not None or method in ("POST", "PUT", "PATCH"):
+        request_headers["Content-Length"] = str(len(data or b""))
+    request_headers = _merge_headers(request_headers, headers)
+    target = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+    message = _request_head(method, target, request_headers) + (data or b"")
+
+    while True:
+        connection, reused = await pool._acquire(scheme, host, port, timeout)
+        reusable = False
+        try:
+            try:
+                connection.writer.write(message)
+                await _wait(connection.writer.drain(), timeout)
+                status, response_headers, keep_alive = await _read_head(connection.reader, timeout)
+            except (asyncio.IncompleteReadError, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection while it was
+                # in the pool. Retry on another one, a fresh connection fails
+                # for real.
+                if reused:
+                    continue
+                raise
+            body, framed = await _read_body(connection.reader, method, status, response_headers, timeout)
+            reusable = keep_alive and framed
+            return status, response_headers, body
+        finally:
+            pool._release(scheme, host, port, connection, reusable)
+
+
+async def _read_head(
+    reader: asyncio.StreamReader, timeout: Optional[float]
+) -> Tuple[int, http.client.HTTPMessage, bool]:
+    while True:
+        line = await _wait(reader.readuntil(b"\n"), timeout)
+        version, _, rest = line.decode("latin-1").strip().partition(" ")
+        if not version.startswith("HTTP/"):
+            raise http.client.BadStatusLine(line.decode("latin-1"))
+        status = int(rest.partition(" ")[0])
+
+        lines = []
+        while True:
+            header_line = await _wait(reader.readuntil(b"\n"), timeout)
+            if header_line in (b"\r\n", b"\n"):
+                break
+            lines.append(header_line)
+            if len(lines) > _MAX_HEADERS:
+                raise http.client.HTTPException(f"got more than {_MAX_HEADERS} headers")
+        # Interim 1xx responses precede the real one.
+        if 100 <= status < 200:
+            continue
+        headers = email.parser.Parser(_class=http.client.HTTPMessage).parsestr(b"".join(lines).decode("latin-1"))
+        connection_header = (headers.get("Connection") or "").lower()
+        if version == "HTTP/1.0":
+            keep_alive = "keep-alive" in connection_header
+        else:
+            keep_alive = "close" not in connection_header
+        return status, headers, keep_alive  # type: ignore
+
+
+async def _read_body(
+    reader: asyncio.StreamReader,
+    method: str,
+    status: int,
+    headers: http.client.HTTPMessage,
+    timeout: Optional[float],
+) -> Tuple[bytes, bool]:
+    """
+    Read a response body, decompressed. Also return whether its end was
+    framed by the response, which is needed to reuse the connection.
+    """
+    if method == "HEAD" or status in (204, 304):
+        return b"", True
+    chunks = []
+    framed = True
+    if "chunked" in (headers.get("Transfer-Encoding") or "").lower():
+        while True:
+            size_line = await _wait(reader.readuntil(b"\n"), timeout)
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+            if size == 0:
+                # Skip the trailer section.
+                while await _wait(reader.readuntil(b"\n"), timeout) not in (b"\r\n", b"\n"):
+                    pass
+                break
+            chunks.append(await _wait(reader.readexactly(size), timeout))
+            await _wait(reader.readexactly(2), timeout)
+    elif headers.get("Content-Length", "").strip().isdigit():
+        remaining = int(headers["Content-Length"])
+        while remaining:
+            chunk = await _wait(reader.read(min(remaining, 65536)), timeout)
+            if not chunk:
+                raise http.client.IncompleteRead(b"".join(chunks), remaining)
+            chunks.append(chunk)
+            remaining -= len(chunk)
+    else:
+        # No framing, the body ends when the server closes the connection.
+        framed = False
+        while True:
+            chunk = await _wait(reader.read(65536), timeout)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+    body = b"".join(chunks)
+    decoder = _content_decoder(headers.get("Content-Encoding"))
+    if decoder is not None:
+        body = decoder.decompress(body) + decoder.flush()
+    return body, framed
@@ -14,14 +14,410 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import base64
+import codecs
+import email.utils
+import functools
+import gzip
+import hashlib
+import http.client
+import http.cookiejar
 import json as json_
-import urllib.error
+import os
+import random
+import ssl
+import sys
+import threading
+import time
 import urllib.parse
 import urllib.request
-from typing import Dict, Optional
+import uuid
+import weakref
+import zlib
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from .mimetypes import guess_type
 
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_MIN_SEGMENT_BYTES = 1024 * 1024
+_MIN_COMPRESS_BYTES = 1024
+_HEURISTIC_FRESHNESS_SECONDS = 24 * 3600
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+# Headers describing a request body, dropped when a redirect turns it into a GET.
+_BODY_HEADERS = ("content-length", "content-type", "content-encoding", "transfer-encoding")
+_Body = Union[bytes, Iterable[bytes]]
+# A timeout in seconds for both connecting and reading, or a (connect, read)
+# tuple. None waits forever.
+_Timeout = Optional[Union[float, Tuple[Optional[float], Optional[float]]]]
+_DEFAULT_TIMEOUT = (10.0, 60.0)
+_NOT_PARSED = object()
+_USER_AGENT = f"Python-urllib/{sys.version_info[0]}.{sys.version_info[1]}"
+_SSL_CONTEXT: Optional[ssl.SSLContext] = None
+_SSL_CONTEXT_LOCK = threading.Lock()
+
+
+def _get_ssl_context() -> ssl.SSLContext:
+    # Building a context loads the system CA bundle, so it is done once and
+    # shared by every HTTPS connection.
+    global _SSL_CONTEXT
+    with _SSL_CONTEXT_LOCK:
+        if _SSL_CONTEXT is None:
+            _SSL_CONTEXT = ssl.create_default_context()
+        return _SSL_CONTEXT
+
+
+def _get_proxy(scheme: str, host: str) -> Optional[Tuple[str, int]]:
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(host):
+        return None
+    parts = urllib.parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+    return parts.hostname or "", parts.port or 8080
+
+
+class ConnectionPool:
+    """
+    Per-host pool of persistent HTTP and HTTPS connections.
+
+    Connections are kept open after a response has been read completely and
+    reused by the next request to the same scheme, host and port, saving the
+    TCP connect and TLS handshake. All HTTPS connections share one SSLContext.
+    The module functions use a shared default pool.
+
+    Attributes:
+        max_connections_per_host (int): Maximum number of open connections per
+            host. Requests over the limit wait for a connection to be released.
+        idle_timeout_seconds (float): Idle connections older than this are
+            closed instead of reused, since servers drop them on their side.
+
+    Example:
+        >>> from src.ut_components.http import ConnectionPool
+        >>>
+        >>> pool = ConnectionPool(max_connections_per_host=2, idle_timeout_seconds=15)
+        >>> connection, reused = pool.acquire("https", "api.example.com", 443)
+        >>> connection.request("GET", "/status")
+        >>> response = connection.getresponse()
+        >>> body = response.read()
+        >>> pool.release("https", "api.example.com", 443, connection, reusable=not response.will_close)
+        >>> pool.close()
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 8,
+        idle_timeout_seconds: float = 30,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ) -> None:
+        """
+        Initialize an empty pool.
+
+        Args:
+            max_connections_per_host (int): Maximum number of open connections
+                per host. Defaults to 8.
+            idle_timeout_seconds (float): How long a released connection may
+                stay idle before it is closed instead of reused. Defaults to 30.
+            ssl_context (Optional[ssl.SSLContext]): Context for HTTPS
+                connections. Defaults to a shared context with the system CAs.
+        """
+        if max_connections_per_host < 1:
+            raise ValueError("max_connections_per_host must be at least 1")
+        self.max_connections_per_host = max_connections_per_host
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self._ssl_context = ssl_context
+        self._idle: Dict[Tuple[str, str, int], List[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._open: Dict[Tuple[str, str, int], int] = {}
+        self._condition = threading.Condition()
+
+    def acquire(
+        self, scheme: str, host: str, port: int, timeout: Optional[float] = None
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Take a connection to a host, reusing an idle one when possible.
+
+        Blocks while the host already has max_connections_per_host connections
+        in use. Every acquired connection must be given back with release().
+
+        Args:
+            scheme (str): "http" or "https".
+            host (str): Host name or address.
+            port (int): TCP port.
+            timeout (Optional[float]): Maximum number of seconds to wait for a
+                connection to be released. None waits forever. Defaults to None.
+
+        Returns:
+            Tuple[http.client.HTTPConnection, bool]: The connection, and whether
+                it was reused from the pool. New connections connect lazily on
+                their first request.
+
+        Raises:
+            TimeoutError: If no connection was released within timeout.
+        """
+        origin = (scheme, host, port)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                idle = self._idle.get(origin)
+                now = time.monotonic()
+                while idle:
+                    connection, released_at = idle.pop()
+                    if now - released_at < self.idle_timeout_seconds:
+                        return connection, True
+                    connection.close()
+                    self._open[origin] -= 1
+                if self._open.get(origin, 0) < self.max_connections_per_host:
+                    self._open[origin] = self._open.get(origin, 0) + 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"timed out waiting for a free connection to {host}:{port}")
+                self._condition.wait(remaining)
+        return self._connect(scheme, host, port), False
+
+    def release(
+        self, scheme: str, host: str, port: int, connection: http.client.HTTPConnection, reusable: bool = True
+    ) -> None:
+        """
+        Give back a connection taken with acquire().
+
+        Args:
+            scheme (str): The scheme the connection was acquired with.
+            host (str): The host the connection was acquired with.
+            port (int): The port the connection was acquired with.
+            connection (http.client.HTTPConnection): The connection.
+            reusable (bool): False closes the connection, for example after an
+                error or a response with "Connection: close". Defaults to True.
+        """
+        origin = (scheme, host, port)
+        with self._condition:
+            if reusable:
+                self._idle.setdefault(origin, []).append((connection, time.monotonic()))
+            else:
+                connection.close()
+                self._open[origin] -= 1
+            self._condition.notify()
+
+    def close(self) -> None:
+        """
+        Close all idle connections.
+
+        Connections in use are closed when they are released as not reusable,
+        or reused later otherwise.
+        """
+        with self._condition:
+            for origin, idle in self._idle.items():
+                for connection, _ in idle:
+                    connection.close()
+                self._open[origin] -= len(idle)
+            self._idle.clear()
+            self._condition.notify_all()
+
+    def _connect(self, scheme: str, host: str, port: int) -> http.client.HTTPConnection:
+        proxy = _get_proxy(scheme, host)
+        if scheme == "https":
+            context = self._ssl_context or _get_ssl_context()
+            if proxy is None:
+                return http.client.HTTPSConnection(host, port, context=context)
+            connection = http.client.HTTPSConnection(proxy[0], proxy[1], context=context)
+            connection.set_tunnel(host, port)
+            return connection
+        if proxy is None:
+            return http.client.HTTPConnection(host, port)
+        return http.client.HTTPConnection(proxy[0], proxy[1])
+
+
+_DEFAULT_POOL = ConnectionPool()
+
+
+class Retry:
+    """
+    Policy for retrying requests after transient failures.
+
+    Network errors, timeouts and the listed status codes are retried, for
+    idempotent methods only, since a request that reached the server may
+    have had an effect. Retries wait with jittered exponential backoff: a
+    random delay between 0 and backoff_factor * 2 ** attempt seconds, capped
+    at max_backoff_seconds. A Retry-After header sent with a 429 or 503 is
+    honored instead, and a response asking for a longer wait than
+    max_backoff_seconds is returned without retrying.
+
+    Attributes:
+        total (int): Maximum number of retries after the first attempt.
+        backoff_factor (float): Base of the exponential backoff in seconds.
+        max_backoff_seconds (float): Longest wait between two attempts.
+        status_forcelist (Tuple[int, ...]): Status codes that are retried.
+        allowed_methods (Tuple[str, ...]): Methods that are retried.
+        respect_retry_after (bool): Whether Retry-After headers are honored.
+
+    Example:
+        >>> from src.ut_components.http import Retry, Session
+        >>>
+        >>> session = Session("https://api.example.com/", retry=Retry(total=4, backoff_factor=1))
+        >>> response = session.get("timeline")
+    """
+
+    def __init__(
+        self,
+        total: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff_seconds: float = 30,
+        status_forcelist: Tuple[int, ...] = (429, 502, 503, 504),
+        allowed_methods: Tuple[str, ...] = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE"),
+        respect_retry_after: bool = True,
+    ) -> None:
+        """
+        Initialize a retry policy.
+
+        Args:
+            total (int): Maximum number of retries after the first attempt.
+                Defaults to 3.
+            backoff_factor (float): Base of the exponential backoff in seconds.
+                Defaults to 0.5.
+            max_backoff_seconds (float): Longest wait between two attempts.
+                Defaults to 30.
+            status_forcelist (Tuple[int, ...]): Status codes that are retried.
+                Defaults to (429, 502, 503, 504).
+            allowed_methods (Tuple[str, ...]): Methods that are retried.
+                Defaults to the idempotent GET, HEAD, OPTIONS, PUT and DELETE.
+            respect_retry_after (bool): Whether Retry-After headers are honored.
+                Defaults to True.
+
+        Raises:
+            ValueError: If total, backoff_factor or max_backoff_seconds is negative.
+        """
+        if total < 0 or backoff_factor < 0 or max_backoff_seconds < 0:
+            raise ValueError("total, backoff_factor and max_backoff_seconds must not be negative")
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff_seconds = max_backoff_seconds
+        self.status_forcelist = tuple(status_forcelist)
+        self.allowed_methods = tuple(method.upper() for method in allowed_methods)
+        self.respect_retry_after = respect_retry_after
+
+    def _delay(self, method: str, attempt: int, status: Optional[int], retry_after: Optional[str]) -> Optional[float]:
+        """
+        Return how long to wait before retrying, or None to give up. A None
+        status stands for a network error.
+        """
+        if attempt >= self.total or method.upper() not in self.allowed_methods:
+            return None
+        if status is not None and status not in self.status_forcelist:
+            return None
+        if retry_after and self.respect_retry_after and status in (429, 503):
+            if retry_after.strip().isdigit():
+                delay = float(retry_after)
+            else:
+                retry_at = _http_date(retry_after)
+                delay = max(0.0, retry_at - time.time()) if retry_at is not None else None
+            if delay is not None:
+                return delay if delay <= self.max_backoff_seconds else None
+        return random.uniform(0, min(self.max_backoff_seconds, self.backoff_factor * 2**attempt))
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker that fails fast while a host is down.
+
+    After failure_threshold consecutive failures, network errors or 5xx
+    responses, requests to the host fail immediately for
+    reset_timeout_seconds instead of waiting for their own timeout. Then one
+    request is let through: a success closes the circuit again, a failure
+    keeps it open for another reset_timeout_seconds.
+
+    Attributes:
+        failure_threshold (int): Consecutive failures that open the circuit.
+        reset_timeout_seconds (float): How long the circuit stays open.
+
+    Example:
+        >>> from src.ut_components.http import CircuitBreaker, Session
+        >>>
+        >>> session = Session("https://nextcloud.example.com/", circuit_breaker=CircuitBreaker())
+        >>> response = session.get("status.php")
+        >>> if session.circuit_breaker.is_open("https://nextcloud.example.com/"):
+        ...     pyotherside.send("server-offline")
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_seconds: float = 30) -> None:
+        """
+        Initialize a circuit breaker with all circuits closed.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit.
+                Defaults to 5.
+            reset_timeout_seconds (float): How long the circuit stays open
+                before a trial request is let through. Defaults to 30.
+
+        Raises:
+            ValueError: If failure_threshold is below 1 or reset_timeout_seconds
+                is negative.
+        """
+        if failure_threshold < 1 or reset_timeout_seconds < 0:
+            raise ValueError("failure_threshold must be at least 1 and reset_timeout_seconds not negative")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._lock = threading.Lock()
+        # Host -> [consecutive failures, time the circuit opened or None].
+        self._hosts: Dict[str, List] = {}
+
+    def is_open(self, url: str) -> bool:
+        """
+        Whether requests to the host of a URL currently fail fast.
+
+        Args:
+            url (str): Any URL of the host.
+
+        Returns:
+            bool: True while the circuit of the host is open.
+        """
+        with self._lock:
+            state = self._hosts.get(_origin(url))
+            return (
+                state is not None and state[1] is not None and time.monotonic() - state[1] < self.reset_timeout_seconds
+            )
+
+    def _allow(self, origin: str) -> bool:
+        with self._lock:
+            state = self._hosts.get(origin)
+            if state is None or state[1] is None:
+                return True
+            if time.monotonic() - state[1] < self.reset_timeout_seconds:
+                return False
+            # Let one trial request through and keep the others failing fast
+            # until it completes.
+            state[1] = time.monotonic()
+            return True
+
+    def _record(self, origin: str, success: bool) -> None:
+        with self._lock:
+            if success:
+                self._hosts.pop(origin, None)
+                return
+            state = self._hosts.setdefault(origin, [0, None])
+            state[0] += 1
+            if state[0] >= self.failure_threshold:
+                state[1] = time.monotonic()
+
+
+def _origin(url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+def _timeouts(timeout: _Timeout) -> Tuple[Optional[float], Optional[float]]:
+    if isinstance(timeout, tuple):
+        return timeout
+    return timeout, timeout
+
 
 class Response:
     """
@@ -36,8 +432,20 @@ class Response:
         url (str): The URL that was requested.
         success (bool): Whether the request completed without network errors.
         status_code (int): HTTP status code (200, 404, etc.). 0 for network errors.
-        data (bytes): Raw response body as bytes.
-        text (str): Response body decoded as UTF-8 string.
+        data (bytes): Raw response body as bytes, decompressed when the server
+            sent it with a gzip or deflate Content-Encoding.
+        text (str): Response body decoded with the charset of the Content-Type
+            header, UTF-8 by default. Decoded on first access.
+        encoding (str): The charset text is decoded with.
+        view (memoryview): Read-only view of data, for slicing large bodies
+            without copies.
+        headers (http.client.HTTPMessage): Response headers. Lookups are
+            case-insensitive, and headers sent more than once can be read with
+            headers.get_all(name). Empty for network errors.
+
+    Responses of requests made with stream=True leave data and text empty and
+    keep their connection open until the body is read with iter_content() or
+    the response is closed.
 
     Example:
         >>> from src.ut_components.http import get
@@ -50,12 +458,104 @@ class Response:
         ...     print(f"Request failed: {response.text}")
     """
 
-    def __init__(self, url: str, success: bool, status_code: int, data: bytes):
+    def __init__(
+        self,
+        url: str,
+        success: bool,
+        status_code: int,
+        data: bytes,
+        headers: Optional[http.client.HTTPMessage] = None,
+    ):
         self.url = url
         self.success = success
         self.status_code = status_code
+        self.headers = headers if headers is not None else http.client.HTTPMessage()
         self.data = data
-        self.text = data.decode("utf-8", errors="ignore")
+        self._stream: Optional[_BodyStream] = None
+
+    @property
+    def data(self) -> bytes:
+        return self._data
+
+    @data.setter
+    def data(self, data: bytes) -> None:
+        self._data = data
+        self._text: Optional[str] = None
+        self._json = _NOT_PARSED
+
+    @property
+    def text(self) -> str:
+        # Binary downloads and callers of json() never pay for the decoding.
+        if self._text is None:
+            self._text = self._data.decode(self.encoding, errors="ignore")
+        return self._text
+
+    @text.setter
+    def text(self, text: str) -> None:
+        self._text = text
+
+    @property
+    def encoding(self) -> str:
+        charset = self.headers.get_content_charset()
+        if charset:
+            try:
+                return codecs.lookup(charset).name
+            except LookupError:
+                pass
+        return "utf-8"
+
+    @property
+    def view(self) -> memoryview:
+        return memoryview(self._data)
+
+    def iter_content(self, chunk_size: int = 65536) -> Iterator[bytes]:
+        """
+        Iterate over the response body in chunks.
+
+        For responses of requests made with stream=True, the body is read from
+        the network as it is consumed, so memory use stays at one chunk no
+        matter the size of the body, and the connection is released when the
+        body ends. Other responses yield slices of data.
+
+        Args:
+            chunk_size (int): Maximum size of each chunk in bytes. Defaults to 64 KiB.
+
+        Yields:
+            bytes: The next chunk of the body.
+
+        Example:
+            >>> with get("https://example.com/video.mp4", stream=True) as response:
+            ...     for chunk in response.iter_content(chunk_size=1024 * 1024):
+            ...         player.feed(chunk)
+        """
+        if self._stream is None:
+            for start in range(0, len(self.data), chunk_size):
+                yield self.data[start : start + chunk_size]
+            return
+        try:
+            while True:
+                chunk = self._stream.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Release the connection of a streamed response.
+
+        A connection whose body was not read to the end is closed instead of
+        going back to the pool. Does nothing for other responses.
+        """
+        if self._stream is not None:
+            self._stream.close()
+
+    def __enter__(self) -> "Response":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
 
     def json(self) -> Dict:
         """
@@ -63,7 +563,8 @@ class Response:
 
         Converts the response data from bytes to a Python dictionary or list
         by parsing it as JSON. This is useful for working with REST APIs that
-        return JSON responses.
+        return JSON responses. The body is parsed once, later calls return the
+        same object.
 
         Returns:
             Dict: Parsed JSON data as a Python dictionary or list.
@@ -77,7 +578,46 @@ class Response:
             ...     user_data = response.json()
             ...     print(f"User name: {user_data['name']}")
         """
-        return json_.loads(self.data)
+        if self._json is _NOT_PARSED:
+            self._json = json_.loads(self._data)
+        return self._json
+
+    def iter_json_items(self, path: Optional[str] = "items", chunk_size: int = 65536) -> Iterator[Any]:
+        """
+        Iterate over the elements of a JSON array in the body as they are parsed.
+
+        The array is found by path, a dot separated chain of object keys, and
+        its elements are decoded one at a time from the body stream. With
+        stream=True the first items are available before the body is
+        downloaded, and memory stays at about one item however long the
+        array is.
+
+        Args:
+            path (Optional[str]): Keys leading to the array, such as "items" or
+                "data.results". None or "" when the body itself is the array.
+                Defaults to "items".
+            chunk_size (int): Size of the chunks read from the body. Defaults
+                to 64 KiB.
+
+        Yields:
+            Any: The next element of the array.
+
+        Raises:
+            ValueError: If the path is not found, does not hold an array, or
+                the body ends too early.
+            json.JSONDecodeError: If an element is not valid JSON.
+
+        Example:
+            >>> with get("https://api.example.com/messages", stream=True) as response:
+            ...     batch = []
+            ...     for message in response.iter_json_items("data.messages"):
+            ...         batch.append(message)
+            ...         if len(batch) == 100:
+            ...             pyotherside.send("messages", batch)
+            ...             batch = []
+        """
+        keys = path.split(".") if path else []
+        yield from _JSONItems(self.iter_content(chunk_size)).items(keys)
 
     def raise_for_status(self):
         """
@@ -112,13 +652,155 @@ class Response:
         return self.__str__()
 
 
+class _JSONItems:
+    """
+    Incremental reader of the elements of a JSON array nested in a stream.
+
+    Keeps only the unparsed tail of the text in memory. Values of other keys
+    are skipped by scanning, without being decoded.
+    """
+
+    _WHITESPACE = " \t\r\n"
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json_.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def items(self, path: List[str]) -> Iterator[Any]:
+        for key in path:
+            self._expect("{")
+            while True:
+                char = self._peek()
+                if char == ",":
+                    self._position += 1
+                    continue
+                if char != '"':
+                    raise ValueError(f"key {key!r} not found in the JSON body")
+                name = self._value()
+                self._expect(":")
+                if name == key:
+                    break
+                self._skip()
+        self._expect("[")
+        while True:
+            char = self._peek()
+            if char == "]":
+                break
+            if char == ",":
+                self._position += 1
+                continue
+            yield self._value()
+        # Read the rest of the body, so the connection can be reused.
+        for _ in self._chunks:
+            pass
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        for chunk in self._chunks:
+            text = self._text_decoder.decode(chunk)
+            if text:
+                # Drop the parsed text while the buffer is copied anyway, so
+                # memory stays at about one chunk and one element.
+                self._buffer = self._buffer[self._position :] + text
+                self._position = 0
+                return True
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        self._eof = True
+        return False
+
+    def _peek(self) -> str:
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in self._WHITESPACE:
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._fill():
+                raise ValueError("unexpected end of the JSON body")
+
+    def _expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"expected {char!r} at offset {self._position} of the JSON body, found {found!r}")
+        self._position += 1
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json_.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number cut by the end of a chunk, like "-4.5e" of "-4.5e3",
+            # decodes fine, so only trust a value followed by a delimiter.
+            delimiter = end
+            while delimiter < len(self._buffer) and self._buffer[delimiter] in self._WHITESPACE:
+                delimiter += 1
+            if (delimiter == len(self._buffer) or self._buffer[delimiter] not in ",]}:") and self._fill():
+                continue
+            self._position = end
+            return value
+
+    def _skip(self) -> None:
+        self._peek()
+        depth = 0
+        in_string = False
+        escaped = False
+        position = self._position
+        while True:
+            if position == len(self._buffer):
+                self._position = position
+                if not self._fill():
+                    if depth == 0 and not in_string:
+                        return
+                    raise ValueError("unexpected end of the JSON body")
+                position = self._position
+            char = self._buffer[position]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                    if depth == 0:
+                        self._position = position + 1
+                        return
+            elif char == '"':
+                in_string = True
+            elif char in "[{":
+                depth += 1
+            elif char in "]}":
+                if depth == 0:
+                    self._position = position
+                    return
+                depth -= 1
+                if depth == 0:
+                    self._position = position + 1
+                    return
+            elif depth == 0 and (char == "," or char in self._WHITESPACE):
+                self._position = position
+                return
+            position += 1
+
+
 def request(
     url: str,
     method: str,
-    data: Optional[bytes] = None,
+    data: Optional[Union[bytes, Iterable[bytes]]] = None,
     headers: Optional[Dict[str, str]] = None,
     follow_redirects: bool = True,
     max_redirects: int = 10,
+    stream: bool = False,
+    timeout: _Timeout = _DEFAULT_TIMEOUT,
+    retry: Optional[Retry] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
 ) -> Response:
     """
     Perform a generic HTTP request with automatic redirect handling.
@@ -131,13 +813,23 @@ def request(
     Args:
         url (str): The target URL for the request.
         method (str): HTTP method (GET, POST, PUT, DELETE, PATCH, etc.).
-        data (Optional[bytes]): Request body as bytes. Defaults to None.
+        data (Optional[Union[bytes, Iterable[bytes]]]): Request body as bytes, or an
+            iterable of byte chunks re-iterated on resend. Defaults to None.
         headers (Optional[Dict[str, str]]): HTTP headers to include in the request.
             Defaults to empty dict.
         follow_redirects (bool): Whether to automatically follow HTTP redirects.
             Defaults to True.
         max_redirects (int): Maximum number of redirects to follow before failing.
             Defaults to 10.
+        stream (bool): Return as soon as the headers arrive, and read the body
+            later with Response.iter_content(). Defaults to False.
+        timeout (Optional[Union[float, Tuple[Optional[float], Optional[float]]]]):
+            Seconds to wait for the connection and for each read from it, or a
+            (connect, read) tuple. None waits forever. Defaults to (10, 60).
+        retry (Optional[Retry]): Policy for retrying transient failures.
+            Defaults to None, which does not retry.
+        circuit_breaker (Optional[CircuitBreaker]): Breaker that fails requests
+            fast while their host is down. Defaults to None.
 
     Returns:
         Response: A Response object containing the result of the HTTP request.
@@ -159,82 +851,132 @@ def request(
         ...     method="HEAD",
         ...     follow_redirects=False
         ... )
+        >>>
+        >>> # Retry a flaky endpoint with backoff, giving up on slow connects
+        >>> response = request(
+        ...     url="https://api.example.com/feed",
+        ...     method="GET",
+        ...     timeout=(5, 30),
+        ...     retry=Retry(total=3),
+        ... )
     """
+    return _request(
+        _DEFAULT_POOL,
+        url,
+        method,
+        data,
+        headers,
+        follow_redirects,
+        max_redirects,
+        stream=stream,
+        timeout=timeout,
+        retry=retry,
+        circuit_breaker=circuit_breaker,
+    )
+
+
+def _request(
+    pool: ConnectionPool,
+    url: str,
+    method: str,
+    data: Optional[Union[bytes, Iterable[bytes]]],
+    headers: Optional[Dict[str, str]],
+    follow_redirects: bool,
+    max_redirects: int,
+    session: Optional["Session"] = None,
+    stream: bool = False,
+    timeout: _Timeout = _DEFAULT_TIMEOUT,
+    retry: Optional[Retry] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+) -> Response:
     redirect_count = 0
+    attempt = 0
     current_url = url
     current_method = method
     current_data = data
+    current_headers = headers
 
     while redirect_count < max_redirects:
-        try:
-            request = urllib.request.Request(
-                current_url,
-                data=current_data,
-                headers=headers or {},
-                method=current_method,
+        origin = _origin(current_url)
+        if circuit_breaker is not None and not circuit_breaker._allow(origin):
+            return Response(
+                url=current_url,
+                success=False,
+                status_code=0,
+                data=f"Circuit breaker open for {origin}".encode(),
             )
-            with urllib.request.urlopen(request) as response:
-                return Response(
+        try:
+            request_headers = current_headers
+            if session is not None:
+                request_headers = session._prepare(current_method, current_url, current_headers or {}, url)
+            body_stream = _open(pool, current_method, current_url, current_data, request_headers, timeout)
+            response = body_stream.response
+            if session is not None:
+                session._extract_cookies(current_url, response)
+            if circuit_breaker is not None:
+                circuit_breaker._record(origin, response.status < 500)
+            delay = None
+            if retry is not None:
+                delay = retry._delay(current_method, attempt, response.status, response.getheader("Retry-After"))
+            if delay is not None:
+                body_stream.close()
+                attempt += 1
+                time.sleep(delay)
+                continue
+            redirect = follow_redirects and response.status in _REDIRECT_STATUSES
+            if stream and not redirect:
+                result = Response(
                     url=current_url,
-                    success=True,
-                    status_code=response.code,
-                    data=response.read(),
+                    success=200 <= response.status < 300,
+                    status_code=response.status,
+                    data=b"",
+                    headers=response.msg,
                 )
-        except urllib.error.HTTPError as e:
-            if follow_redirects and e.code in (301, 302, 303, 307, 308):
-                redirect_count += 1
-                location = e.headers.get("Location")
-                if not location:
-                    error_content = b""
-                    try:
-                        if e.fp:
-                            error_content = e.fp.read()
-                    except Exception:
-                        pass
-                    return Response(
-                        url=current_url,
-                        success=False,
-                        status_code=e.code,
-                        data=error_content,
-                    )
-
-                if not location.startswith(("http://", "https://")):
-                    from urllib.parse import urljoin
-
-                    location = urljoin(current_url, location)
-
-                current_url = location
-
-                if e.code == 303 or (e.code in (301, 302) and current_method in ("POST", "PUT", "DELETE")):
-                    current_method = "GET"
-                    current_data = None
-                elif e.code in (307, 308):
-                    pass
-
-                continue
-            else:
-                error_content = b""
-                try:
-                    if e.fp:
-                        error_content = e.fp.read()
-                except Exception:
-                    pass
-
+                result._stream = body_stream
+                return result
+            try:
+                body = body_stream.read()
+            finally:
+                body_stream.close()
+        except Exception as e:
+            # Only network errors and timeouts count, not invalid requests.
+            network_error = isinstance(e, (OSError, http.client.HTTPException))
+            if circuit_breaker is not None and network_error:
+                circuit_breaker._record(origin, False)
+            delay = None
+            if retry is not None and network_error:
+                delay = retry._delay(current_method, attempt, None, None)
+            if delay is None:
+                return Response(url=current_url, success=False, status_code=0, data=str(e).encode())
+            attempt += 1
+            time.sleep(delay)
+            continue
+
+        if redirect:
+            redirect_count += 1
+            location = response.getheader("Location")
+            if not location:
                 return Response(
                     url=current_url,
                     success=False,
-                    status_code=e.code,
-                    data=error_content,
+                    status_code=response.status,
+                    data=body,
+                    headers=response.msg,
                 )
-        except urllib.error.URLError as e:
-            return Response(
-                url=current_url,
-                success=False,
-                status_code=0,
-                data=str(e.reason).encode(),
+
+            current_url = urllib.parse.urljoin(current_url, location)
+            current_method, current_data, current_headers = _redirect_request(
+                response.status, current_method, current_data, current_headers
             )
-        except Exception as e:
-            return Response(url=current_url, success=False, status_code=0, data=str(e).encode())
+            continue
+
+        return Response(
+            url=current_url,
+            success=200 <= response.status < 300,
+            status_code=response.status,
+            data=body,
+            headers=response.msg,
+        )
 
     return Response(
         url=current_url,
@@ -244,7 +986,314 @@ def request(
     )
 
 
-def post(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None) -> Response:
+def _redirect_request(
+    status: int, method: str, data: Optional[_Body], headers: Optional[Dict[str, str]]
+) -> Tuple[str, Optional[_Body], Optional[Dict[str, str]]]:
+    # 303, and 301/302 for the methods browsers switch too, repeat the request
+    # as a GET without body. 307 and 308 repeat it unchanged.
+    if status == 303 or (status in (301, 302) and method in ("POST", "PUT", "DELETE")):
+        # A Content-Length left for the dropped body makes the server wait
+        # for bytes that never come.
+        if headers:
+            headers = {name: value for name, value in headers.items() if name.lower() not in _BODY_HEADERS}
+        return "GET", None, headers
+    return method, data, headers
+
+
+def _merge_headers(*layers: Optional[Dict[str, str]]) -> Dict[str, str]:
+    # Header names are case-insensitive, a later layer replaces a header of an
+    # earlier one even if the names are spelled differently.
+    merged: Dict[str, str] = {}
+    names: Dict[str, str] = {}
+    for layer in layers:
+        for name, value in (layer or {}).items():
+            merged.pop(names.get(name.lower(), name), None)
+            names[name.lower()] = name
+            merged[name] = value
+    return merged
+
+
+def _json_request(
+    json: Optional[Dict], headers: Optional[Dict[str, str]], compress: bool = False
+) -> Tuple[bytes, Dict[str, str]]:
+    data = b""
+    request_headers = {}
+    if json:
+        data = json_.dumps(json).encode("utf-8")
+        request_headers["Content-Type"] = "application/json"
+        # Below about a kilobyte the gzip framing costs more than it saves.
+        if compress and len(data) >= _MIN_COMPRESS_BYTES:
+            data = gzip.compress(data, compresslevel=6)
+            request_headers["Content-Encoding"] = "gzip"
+
+    if headers:
+        request_headers.update(headers)
+    return data, request_headers
+
+
+def _with_params(url: str, params: Optional[Dict[str, str]]) -> str:
+    if params:
+        query_string = urllib.parse.urlencode(params)
+        url = f"{url}?{query_string}"
+    return url
+
+
+class _MultipartBody:
+    """
+    multipart/form-data body streamed from memory, paths and file objects.
+
+    The total length is known up front, so it is sent with Content-Length,
+    and files are read one chunk at a time while the body is sent. Every
+    iteration produces the whole body again, so the request can be resent
+    after a redirect or a dropped keep-alive connection.
+    """
+
+    def __init__(
+        self,
+        boundary: str,
+        form_fields: Optional[Dict[str, str]],
+        files: List[Tuple[str, str, Union[str, bytes, BinaryIO]]],
+        on_progress: Optional[Callable[[int, int], None]],
+        chunk_size: int = 65536,
+    ) -> None:
+        self._on_progress = on_progress
+        self._chunk_size = chunk_size
+        self._segments: List[Tuple[Union[str, bytes, BinaryIO], int, int]] = []
+        for field_name, field_value in (form_fields or {}).items():
+            self._add(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{field_name}"\r\n\r\n{field_value}\r\n'.encode()
+            )
+        for file_field, file_name, source in files:
+            mime_type = guess_type(file_name)[0] or "application/octet-stream"
+            self._add(
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="{file_field}"; filename="{file_name}"\r\n'
+                f"Content-Type: {mime_type}\r\n\r\n".encode()
+            )
+            if isinstance(source, str):
+                self._segments.append((source, 0, os.path.getsize(source)))
+            elif isinstance(source, bytes):
+                self._add(source)
+            else:
+                position = source.tell()
+                self._segments.append((source, position, source.seek(0, os.SEEK_END) - position))
+                source.seek(position)
+            self._add(b"\r\n")
+        self._add(f"--{boundary}--".encode())
+        self.length = sum(size for _, _, size in self._segments)
+
+    def _add(self, data: bytes) -> None:
+        self._segments.append((data, 0, len(data)))
+
+    def __iter__(self) -> Iterator[bytes]:
+        sent = 0
+        for source, position, size in self._segments:
+            for chunk in self._read(source, position, size):
+                yield chunk
+                sent += len(chunk)
+                if self._on_progress is not None:
+                    self._on_progress(sent, self.length)
+
+    def _read(self, source: Union[str, bytes, BinaryIO], position: int, size: int) -> Iterator[bytes]:
+        if isinstance(source, bytes):
+            view = memoryview(source)
+            for start in range(0, size, self._chunk_size):
+                yield view[start : start + self._chunk_size]  # type: ignore
+            return
+        f = open(source, "rb") if isinstance(source, str) else source
+        try:
+            f.seek(position)
+            remaining = size
+            while remaining > 0:
+                chunk = f.read(min(self._chunk_size, remaining))
+                if not chunk:
+                    raise ValueError(f"{getattr(f, 'name', 'file')} is shorter than when the upload started")
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            if isinstance(source, str):
+                f.close()
+
+
+def _multipart_request(
+    file_data: Optional[Union[str, bytes, BinaryIO]],
+    file_name: Optional[str],
+    file_field: Optional[str],
+    form_fields: Optional[Dict[str, str]],
+    headers: Optional[Dict[str, str]],
+    files: Optional[Dict[str, Union[str, BinaryIO, Tuple[str, Union[str, bytes, BinaryIO]]]]] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Tuple[_MultipartBody, Dict[str, str]]:
+    uploads: List[Tuple[str, str, Union[str, bytes, BinaryIO]]] = []
+    if file_data is not None:
+        if not file_field:
+            raise ValueError("file_field is required with file_data")
+        uploads.append((file_field, file_name or _file_name(file_data), file_data))
+    for field, source in (files or {}).items():
+        if isinstance(source, tuple):
+            uploads.append((field, source[0], source[1]))
+        else:
+            uploads.append((field, _file_name(source), source))
+    if not uploads:
+        raise ValueError("post_file needs file_data or files")
+
+    boundary = f"----WebKitFormBoundary{uuid.uuid4().hex[:16]}"
+    body = _MultipartBody(boundary, form_fields, uploads, on_progress)
+    request_headers = {"Content-Type": f"multipart/form-data; boundary={boundary}", "Content-Length": str(body.length)}
+    if headers:
+        request_headers.update(headers)
+    return body, request_headers
+
+
+def _file_name(source: Union[str, bytes, BinaryIO]) -> str:
+    if isinstance(source, str):
+        return os.path.basename(source)
+    return os.path.basename(getattr(source, "name", "") or "") or "file"
+
+
+class _ContentDecoder:
+    """
+    Incremental decoder of a gzip or deflate Content-Encoding.
+    """
+
+    def __init__(self, encoding: str) -> None:
+        self._encoding = encoding
+        self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS if encoding in ("gzip", "x-gzip") else zlib.MAX_WBITS)
+
+    def decompress(self, raw: bytes) -> bytes:
+        try:
+            return self._decoder.decompress(raw)
+        except zlib.error:
+            # Some servers send "deflate" as a raw stream without the zlib
+            # header the RFC asks for, retry the first chunk as raw deflate.
+            if self._encoding != "deflate" or self._decoder.eof or self._decoder.unused_data:
+                raise
+            self._encoding = "raw deflate"
+            self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._decoder.decompress(raw)
+
+    def flush(self) -> bytes:
+        return self._decoder.flush()
+
+
+def _content_decoder(encoding: Optional[str]) -> Optional[_ContentDecoder]:
+    encoding = (encoding or "").strip().lower()
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        return _ContentDecoder(encoding)
+    return None
+
+
+class _BodyStream:
+    """
+    Unread response body that holds its pooled connection until closed.
+
+    The connection goes back to the pool when the body has been read to the
+    end, and is closed otherwise, since unread bytes would corrupt the next
+    response on it. Bodies sent with a gzip or deflate Content-Encoding are
+    decompressed as they are read. A stream dropped without close() closes
+    its connection when garbage collected, so it does not hold a pool slot.
+    """
+
+    def __init__(self, response: http.client.HTTPResponse, release: Callable[..., None]) -> None:
+        self.response = response
+        self._release = weakref.finalize(self, release, reusable=False)
+        self._release.atexit = False
+        self._failed = False
+        self._decoder = _content_decoder(response.getheader("Content-Encoding"))
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        try:
+            if self._decoder is None:
+                return self._read_raw(size)
+            while size < 0 or len(self._buffer) < size:
+                raw = self._read_raw(size)
+                if not raw:
+                    self._buffer += self._decoder.flush()
+                    break
+                self._buffer += self._decoder.decompress(raw)
+        except BaseException:
+            self._failed = True
+            raise
+        if size < 0:
+            chunk, self._buffer = self._buffer, b""
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    def _read_raw(self, size: int) -> bytes:
+        chunk = self.response.read(size if size >= 0 else None)
+        # read(size) returns b"" instead of raising when the connection
+        # drops before Content-Length bytes arrived.
+        if not chunk and size and self.response.length:
+            raise http.client.IncompleteRead(b"", self.response.length)
+        return chunk
+
+    def close(self) -> None:
+        detached = self._release.detach()
+        if detached is None:
+            return
+        release = detached[1]
+        release(reusable=not self._failed and self.response.isclosed() and not self.response.will_close)
+
+
+def _open(
+    pool: ConnectionPool,
+    method: str,
+    url: str,
+    data: Optional[Union[bytes, Iterable[bytes]]],
+    headers: Optional[Dict[str, str]],
+    timeout: _Timeout = _DEFAULT_TIMEOUT,
+) -> _BodyStream:
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        raise ValueError(f"unsupported url: {url}")
+    host = parts.hostname
+    port = parts.port or _DEFAULT_PORTS[scheme]
+
+    request_headers = {"User-Agent": _USER_AGENT, "Accept-Encoding": "gzip, deflate"}
+    if data is not None:
+        request_headers["Content-Type"] = "application/x-www-form-urlencoded"
+    request_headers = _merge_headers(request_headers, headers)
+
+    if scheme == "http" and _get_proxy(scheme, host) is not None:
+        target = urllib.parse.urlunsplit((scheme, parts.netloc, parts.path or "/", parts.query, ""))
+    else:
+        target = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+
+    connect_timeout, read_timeout = _timeouts(timeout)
+    while True:
+        connection, reused = pool.acquire(scheme, host, port, connect_timeout)
+        try:
+            if connection.sock is None:
+                connection.timeout = connect_timeout
+                connection.connect()
+            connection.sock.settimeout(read_timeout)
+            connection.request(method, target, body=data, headers=request_headers)
+            response = connection.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            pool.release(scheme, host, port, connection, reusable=False)
+            # The server closed an idle keep-alive connection while it was in
+            # the pool. Retry on another one, a fresh connection fails for real.
+            if reused:
+                continue
+            raise
+        except BaseException:
+            pool.release(scheme, host, port, connection, reusable=False)
+            raise
+        return _BodyStream(response, functools.partial(pool.release, scheme, host, port, connection))
+
+
+def post(
+    url: str,
+    json: Optional[Dict] = None,
+    headers: Optional[Dict[str, str]] = None,
+    compress: bool = False,
+    timeout: _Timeout = _DEFAULT_TIMEOUT,
+    retry: Optional[Retry] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+) -> Response:
     """
     Perform an HTTP POST request to send data to a server.
 
@@ -261,6 +1310,15 @@ def post(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]
         headers (Optional[Dict[str, str]]): Additional HTTP headers to include.
             The Content-Type header is automatically set when json is provided.
             Defaults to None.
+        compress (bool): Gzip JSON bodies of 1 KiB or more and send them with
+            Content-Encoding: gzip. Only use it with servers that accept
+            compressed requests. Defaults to False.
+        timeout (Optional[Union[float, Tuple[Optional[float], Optional[float]]]]):
+            Connect and read timeout, see request(). Defaults to (10, 60).
+        retry (Optional[Retry]): Policy for retrying transient failures.
+            Defaults to None, which does not retry.
+        circuit_breaker (Optional[CircuitBreaker]): Breaker that fails requests
+            fast while their host is down. Defaults to None.
 
     Returns:
         Response: A Response object containing the server's response.
@@ -287,22 +1345,27 @@ def post(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]
         ...     headers={"Authorization": "Bearer token123"}
         ... )
     """
-    data = b""
-    request_headers = {}
-    if json:
-        data = json_.dumps(json).encode("utf-8")
-        request_headers["Content-Type"] = "application/json"
-
-    if headers:
-        request_headers.update(headers)
-
-    return request(url, method="POST", data=data, headers=request_headers)
+    data, request_headers = _json_request(json, headers, compress)
+    return request(
+        url,
+        method="POST",
+        data=data,
+        headers=request_headers,
+        timeout=timeout,
+        retry=retry,
+        circuit_breaker=circuit_breaker,
+    )
 
 
 def get(
     url: str,
     headers: Optional[Dict[str, str]] = None,
     params: Optional[Dict[str, str]] = None,
+    stream: bool = False,
+    cache: Union[bool, "HTTPCache"] = False,
+    timeout: _Timeout = _DEFAULT_TIMEOUT,
+    retry: Optional[Retry] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
 ) -> Response:
     """
     Perform an HTTP GET request to retrieve data from a server.
@@ -318,6 +1381,17 @@ def get(
             Common headers include Authorization, User-Agent, etc. Defaults to None.
         params (Optional[Dict[str, str]]): Query parameters to append to the URL.
             These will be URL-encoded automatically. Defaults to None.
+        stream (bool): Return as soon as the headers arrive, and read the body
+            later with Response.iter_content(). Defaults to False.
+        cache (Union[bool, HTTPCache]): Answer from an HTTPCache following the
+            caching headers of the server. True uses a shared cache in the app
+            cache directory. Not used with stream=True. Defaults to False.
+        timeout (Optional[Union[float, Tuple[Optional[float], Optional[float]]]]):
+            Connect and read timeout, see request(). Defaults to (10, 60).
+        retry (Optional[Retry]): Policy for retrying transient failures.
+            Defaults to None, which does not retry.
+        circuit_breaker (Optional[CircuitBreaker]): Breaker that fails requests
+            fast while their host is down. Defaults to None.
 
     Returns:
         Response: A Response object containing the server's response.
@@ -341,19 +1415,140 @@ def get(
         ...     url="https://api.example.com/profile",
         ...     headers={"Authorization": "Bearer token123"}
         ... )
+        >>>
+        >>> # Reuse the cached response while the server says it is fresh
+        >>> response = get("https://api.example.com/categories", cache=True)
     """
-    request_headers = {}
-    if params:
-        query_string = urllib.parse.urlencode(params)
-        url = f"{url}?{query_string}"
+    if cache and not stream:
+        send = functools.partial(request, timeout=timeout, retry=retry, circuit_breaker=circuit_breaker)
+        return _cached_get(send, _with_params(url, params), headers, cache)
+    return request(
+        _with_params(url, params),
+        method="GET",
+        headers=dict(headers or {}),
+        stream=stream,
+        timeout=timeout,
+        retry=retry,
+        circuit_breaker=circuit_breaker,
+    )
 
-    if headers:
-        request_headers.update(headers)
 
-    return request(url, method="GET", headers=request_headers)
+def get_many(
+    urls_or_requests: Iterable[Union[str, Dict]],
+    max_concurrency: int = 8,
+    as_completed: bool = False,
+    timeout: _Timeout = _DEFAULT_TIMEOUT,
+    retry: Optional[Retry] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+) -> Union[List[Response], Iterator[Tuple[int, Response]]]:
+    """
+    Perform several GET requests in parallel.
+
+    Requests run on a thread pool over the shared connection pool, so the
+    total time is close to the slowest request instead of the sum of all of
+    them. At most max_concurrency requests are in flight, and no more per host
+    than the connection pool allows, so one slow host does not hold the
+    workers that other hosts could use.
+
+    Args:
+        urls_or_requests (Iterable[Union[str, Dict]]): URLs, or dicts of get()
+            keyword arguments such as {"url": ..., "params": ..., "cache": True}.
+        max_concurrency (int): Maximum number of requests in flight. Defaults to 8.
+        as_completed (bool): Return an iterator of (index, Response) pairs in
+            completion order instead of a list. Defaults to False.
+        timeout (Optional[Union[float, Tuple[Optional[float], Optional[float]]]]):
+            Connect and read timeout of every request, see request(). A request
+            dict can override it. Defaults to (10, 60).
+        retry (Optional[Retry]): Policy for retrying transient failures of
+            every request. Defaults to None, which does not retry.
+        circuit_breaker (Optional[CircuitBreaker]): Breaker that fails requests
+            fast while their host is down. Defaults to None.
+
+    Returns:
+        Union[List[Response], Iterator[Tuple[int, Response]]]: The responses in
+            input order, or (input index, Response) pairs as they complete.
 
+    Raises:
+        ValueError: If max_concurrency is below 1, or a request dict has no url.
 
-def put(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None) -> Response:
+    Example:
+        >>> from src.ut_components.http import get_many
+        >>>
+        >>> responses = get_many([f"https://api.example.com/users/{id}" for id in user_ids])
+        >>> users = [response.json() for response in responses if response.success]
+        >>>
+        >>> # Show avatars as soon as each one arrives
+        >>> for index, response in get_many(avatar_urls, max_concurrency=6, as_completed=True):
+        ...     pyotherside.send("avatar", index, response.data)
+    """
+    send = functools.partial(get, timeout=timeout, retry=retry, circuit_breaker=circuit_breaker)
+    return _get_many(send, _DEFAULT_POOL, lambda url: url, urls_or_requests, max_concurrency, as_completed)
+
+
+def _get_many(
+    send: Callable[..., Response],
+    pool: ConnectionPool,
+    resolve: Callable[[str], str],
+    urls_or_requests: Iterable[Union[str, Dict]],
+    max_concurrency: int,
+    as_completed: bool,
+) -> Union[List[Response], Iterator[Tuple[int, Response]]]:
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    pending = []
+    for index, item in enumerate(urls_or_requests):
+        arguments = {"url": item} if isinstance(item, str) else dict(item)
+        if not arguments.get("url"):
+            raise ValueError(f"request {index} has no url")
+        parts = urllib.parse.urlsplit(resolve(arguments["url"]))
+        pending.append((index, arguments, (parts.scheme.lower(), parts.netloc.lower())))
+
+    completed = _iter_many(send, pool.max_connections_per_host, pending, max_concurrency)
+    if as_completed:
+        return completed
+    responses: List[Optional[Response]] = [None] * len(pending)
+    for index, response in completed:
+        responses[index] = response
+    return responses  # type: ignore
+
+
+def _iter_many(
+    send: Callable[..., Response],
+    max_per_host: int,
+    pending: List[Tuple[int, Dict, Tuple[str, str]]],
+    max_concurrency: int,
+) -> Iterator[Tuple[int, Response]]:
+    in_flight: Dict[Tuple[str, str], int] = {}
+    futures: Dict[Future, Tuple[int, Tuple[str, str]]] = {}
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(pending)) or 1) as executor:
+        while pending or futures:
+            # Start requests in input order, skipping hosts at their limit
+            # until one of their requests completes.
+            waiting = []
+            for index, arguments, host in pending:
+                if len(futures) < max_concurrency and in_flight.get(host, 0) < max_per_host:
+                    in_flight[host] = in_flight.get(host, 0) + 1
+                    futures[executor.submit(send, **arguments)] = (index, host)
+                else:
+                    waiting.append((index, arguments, host))
+            pending = waiting
+
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, host = futures.pop(future)
+                in_flight[host] -= 1
+                yield index, future.result()
+
+
+def put(
+    url: str,
+    json: Optional[Dict] = None,
+    headers: Optional[Dict[str, str]] = None,
+    compress: bool = False,
+    timeout: _Timeout = _DEFAULT_TIMEOUT,
+    retry: Optional[Retry] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+) -> Response:
     """
     Perform an HTTP PUT request to update existing resources on a server.
 
@@ -371,6 +1566,15 @@ def put(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]]
         headers (Optional[Dict[str, str]]): Additional HTTP headers to include.
             The Content-Type header is automatically set when json is provided.
             Defaults to None.
+        compress (bool): Gzip JSON bodies of 1 KiB or more and send them with
+            Content-Encoding: gzip. Only use it with servers that accept
+            compressed requests. Defaults to False.
+        timeout (Optional[Union[float, Tuple[Optional[float], Optional[float]]]]):
+            Connect and read timeout, see request(). Defaults to (10, 60).
+        retry (Optional[Retry]): Policy for retrying transient failures.
+            Defaults to None, which does not retry.
+        circuit_breaker (Optional[CircuitBreaker]): Breaker that fails requests
+            fast while their host is down. Defaults to None.
 
     Returns:
         Response: A Response object containing the server's response.
@@ -398,19 +1602,26 @@ def put(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]]
         ...     headers={"Authorization": "Bearer token123"}
         ... )
     """
-    data = b""
-    request_headers = {}
-    if json:
-        data = json_.dumps(json).encode("utf-8")
-        request_headers["Content-Type"] = "application/json"
-
-    if headers:
-        request_headers.update(headers)
-
-    return request(url, method="PUT", data=data, headers=request_headers)
+    data, request_headers = _json_request(json, headers, compress)
+    return request(
+        url,
+        method="PUT",
+        data=data,
+        headers=request_headers,
+        timeout=timeout,
+        retry=retry,
+        circuit_breaker=circuit_breaker,
+    )
 
 
-def delete(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None) -> Response:
+def delete(
+    url: str,
+    json: Optional[Dict] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: _Timeout = _DEFAULT_TIMEOUT,
+    retry: Optional[Retry] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+) -> Response:
     """
     Perform an HTTP DELETE request to remove a resource from a server.
 
@@ -428,6 +1639,12 @@ def delete(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, st
         headers (Optional[Dict[str, str]]): Additional HTTP headers to include.
             The Content-Type header is automatically set when json is provided.
             Defaults to None.
+        timeout (Optional[Union[float, Tuple[Optional[float], Optional[float]]]]):
+            Connect and read timeout, see request(). Defaults to (10, 60).
+        retry (Optional[Retry]): Policy for retrying transient failures.
+            Defaults to None, which does not retry.
+        circuit_breaker (Optional[CircuitBreaker]): Breaker that fails requests
+            fast while their host is down. Defaults to None.
 
     Returns:
         Response: A Response object containing the server's response.
@@ -452,25 +1669,623 @@ def delete(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, st
         ...     headers={"Authorization": "Bearer token123"}
         ... )
     """
-    data = b""
-    request_headers = {}
-    if json:
-        data = json_.dumps(json).encode("utf-8")
-        request_headers["Content-Type"] = "application/json"
+    data, request_headers = _json_request(json, headers)
+    return request(
+        url,
+        method="DELETE",
+        data=data,
+        headers=request_headers,
+        timeout=timeout,
+        retry=retry,
+        circuit_breaker=circuit_breaker,
+    )
+
+
+def download(
+    url: str,
+    dest_path: str,
+    chunk_size: int = 65536,
+    on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    resume: bool = True,
+    segments: int = 1,
+    timeout: _Timeout = _DEFAULT_TIMEOUT,
+    retry: Optional[Retry] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+) -> Response:
+    """
+    Download a URL straight to a file, with flat memory use.
+
+    The body is streamed to "<dest_path>.part" one chunk at a time and the
+    file is renamed to dest_path once it is complete, so dest_path never holds
+    a partial download and memory use does not depend on the file size.
+
+    With resume, a download that failed halfway continues where it stopped
+    the next time it is called, using a Range request validated by the ETag
+    or Last-Modified of the first attempt, so a changed file is downloaded
+    again from the start. With segments, large files on servers that support
+    ranges are fetched in that many parallel parts over pooled connections,
+    written in place into the same file.
+
+    Args:
+        url (str): The URL to download.
+        dest_path (str): Where to save the file. Replaced if it exists.
+        chunk_size (int): Size of the chunks read from the network and written
+            to disk, in bytes. Defaults to 64 KiB.
+        on_progress (Optional[Callable[[int, Optional[int]], None]]): Called
+            after each chunk with the bytes downloaded so far and the total
+            size, or None if the server did not send Content-Length.
+            Defaults to None.
+        headers (Optional[Dict[str, str]]): HTTP headers to include in the
+            request. Defaults to None.
+        resume (bool): Keep the partial file of a failed download, with its
+            validator in "<dest_path>.part.json", and continue from it on the
+            next call. Defaults to True.
+        segments (int): Number of parallel range requests used for files of
+            at least 1 MiB per segment. Servers without range support, or
+            without an ETag or Last-Modified, get a single request.
+            Defaults to 1.
+        timeout (Optional[Union[float, Tuple[Optional[float], Optional[float]]]]):
+            Connect and read timeout of each request, see request(). The read
+            timeout applies to each chunk, not to the whole file.
+            Defaults to (10, 60).
+        retry (Optional[Retry]): Policy for retrying transient failures.
+            Defaults to None, which does not retry.
+        circuit_breaker (Optional[CircuitBreaker]): Breaker that fails requests
+            fast while their host is down. Defaults to None.
+
+    Returns:
+        Response: The response, with an empty body on success. When the server
+            answers with an error status, data holds the error body and no file
+            is written.
+
+    Example:
+        >>> from src.ut_components.http import download
+        >>>
+        >>> def show_progress(done, total):
+        ...     if total:
+        ...         pyotherside.send("download-progress", done / total)
+        >>>
+        >>> response = download(
+        ...     "https://example.com/video.mp4",
+        ...     os.path.join(get_cache_path(), "video.mp4"),
+        ...     on_progress=show_progress,
+        ... )
+        >>> response.raise_for_status()
+        >>>
+        >>> # Large file in 4 parallel parts
+        >>> download("https://example.com/backup.tar", "/path/backup.tar", segments=4)
+    """
+    send = functools.partial(request, timeout=timeout, retry=retry, circuit_breaker=circuit_breaker)
+    return _download(send, url, dest_path, chunk_size, on_progress, headers, resume, segments)
+
+
+class _Progress:
+    # Download progress shared by the segment threads of one download.
+    def __init__(self, callback: Optional[Callable[[int, Optional[int]], None]]) -> None:
+        self._callback = callback
+        self._lock = threading.Lock()
+        self.done = 0
+        self.total: Optional[int] = None
+
+    def start(self, done: int, total: Optional[int]) -> None:
+        self.done = done
+        self.total = total
+
+    def add(self, size: int) -> None:
+        with self._lock:
+            self.done += size
+            if self._callback is not None:
+                self._callback(self.done, self.total)
 
-    if headers:
-        request_headers.update(headers)
 
-    return request(url, method="DELETE", data=data, headers=request_headers)
+def _download(
+    send: Callable[..., Response],
+    url: str,
+    dest_path: str,
+    chunk_size: int,
+    on_progress: Optional[Callable[[int, Optional[int]], None]],
+    headers: Optional[Dict[str, str]],
+    resume: bool = True,
+    segments: int = 1,
+) -> Response:
+    # Byte ranges must refer to the file itself, not to a compressed copy.
+    headers = _merge_headers({"Accept-Encoding": "identity"}, headers)
+    part_path = f"{dest_path}.part"
+    state_path = f"{part_path}.json"
+    state = _load_download_state(state_path, url) if resume else None
+    if state is None:
+        _remove_files(part_path, state_path)
+
+    progress = _Progress(on_progress)
+    result = None
+    try:
+        if (state is None and segments > 1) or (state is not None and state.get("segments")):
+            result = _download_segments(
+                send, url, part_path, state_path, chunk_size, headers, progress, state, segments, resume
+            )
+        if result is None:
+            result = _download_single(send, url, part_path, state_path, chunk_size, headers, progress, state, resume)
+        if result.success:
+            os.replace(part_path, dest_path)
+            _remove_files(state_path)
+    except Exception as e:
+        result = Response(url, False, 0, str(e).encode())
+
+    # Partial files are kept for the next attempt only when the failure may be
+    # temporary, a client error will not go away by retrying.
+    if not result.success and (not resume or 400 <= result.status_code < 500):
+        _remove_files(part_path, state_path)
+    return result
+
+
+def _download_single(
+    send: Callable[..., Response],
+    url: str,
+    part_path: str,
+    state_path: str,
+    chunk_size: int,
+    headers: Optional[Dict[str, str]],
+    progress: _Progress,
+    state: Optional[Dict],
+    resume: bool,
+) -> Response:
+    offset = os.path.getsize(part_path) if state is not None and os.path.exists(part_path) else 0
+    request_headers = headers
+    if offset:
+        request_headers = _merge_headers(headers, {"Range": f"bytes={offset}-", "If-Range": state["validator"]})
+
+    response = send(url, method="GET", headers=request_headers, stream=True)
+    if offset and response.status_code == 416:
+        # The partial file is not a prefix of the current file, start over.
+        response.close()
+        _remove_files(part_path, state_path)
+        return _download_single(send, url, part_path, state_path, chunk_size, headers, progress, None, resume)
+    if not response.success:
+        return Response(response.url, False, response.status_code, b"".join(response.iter_content()), response.headers)
+    if response.status_code != 206:
+        # A full body: ranges are not supported, or the file changed and
+        # If-Range made the server send all of it again.
+        offset = 0
+
+    validator = _validator(response.headers)
+    if resume and validator:
+        _save_download_state(state_path, {"url": url, "validator": validator, "segments": None})
+    content_length = response.headers.get("Content-Length")
+    total = offset + int(content_length) if content_length and content_length.isdigit() else None
+    progress.start(offset, total)
+
+    with open(part_path, "ab" if offset else "wb") as f:
+        for chunk in response.iter_content(chunk_size):
+            f.write(chunk)
+            progress.add(len(chunk))
+        f.flush()
+        os.fsync(f.fileno())
+    return Response(response.url, True, response.status_code, b"", response.headers)
+
+
+def _download_segments(
+    send: Callable[..., Response],
+    url: str,
+    part_path: str,
+    state_path: str,
+    chunk_size: int,
+    headers: Optional[Dict[str, str]],
+    progress: _Progress,
+    state: Optional[Dict],
+    segments: int,
+    resume: bool,
+) -> Optional[Response]:
+    response_headers = http.client.HTTPMessage()
+    if state is None:
+        head = send(url, method="HEAD", headers=headers)
+        content_length = head.headers.get("Content-Length", "")
+        validator = _validator(head.headers)
+        if (
+            not head.success
+            or head.headers.get("Accept-Ranges", "").lower() != "bytes"
+            or not content_length.isdigit()
+            or not validator
+            or int(content_length) < segments * _MIN_SEGMENT_BYTES
+        ):
+            return None
+        total = int(content_length)
+        size = -(-total // segments)
+        state = {
+            "url": url,
+            "source": head.url,
+            "validator": validator,
+            "total": total,
+            "segments": [[start, min(start + size, total) - 1, 0] for start in range(0, total, size)],
+        }
+        response_headers = head.headers
+        with open(part_path, "wb") as f:
+            f.truncate(total)
+
+    ranges = state["segments"]
+    progress.start(sum(done for _, _, done in ranges), state["total"])
+    changed = threading.Event()
+
+    def fetch(segment: List[int]) -> None:
+        start, end, done = segment
+        if start + done > end or changed.is_set():
+            return
+        range_headers = {"Range": f"bytes={start + done}-{end}", "If-Range": state["validator"]}
+        response = send(state["source"], method="GET", headers=_merge_headers(headers, range_headers), stream=True)
+        with response:
+            if not response.success:
+                raise ValueError(f"Segment request to url {url} failed with status code: {response.status_code}")
+            if response.status_code != 206:
+                changed.set()
+                return
+            with open(part_path, "r+b") as f:
+                f.seek(start + done)
+                for chunk in response.iter_content(chunk_size):
+                    f.write(chunk)
+                    segment[2] += len(chunk)
+                    progress.add(len(chunk))
+                f.flush()
+                os.fsync(f.fileno())
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+            for future in [executor.submit(fetch, segment) for segment in ranges]:
+                future.result()
+    finally:
+        # Saved after the segment files are closed, so the recorded progress
+        # never claims bytes that are not on disk.
+        if resume and not changed.is_set():
+            _save_download_state(state_path, state)
+
+    if changed.is_set():
+        _remove_files(part_path, state_path)
+        progress.start(0, None)
+        return None
+    return Response(url, True, 200, b"", response_headers)
+
+
+def _validator(headers: http.client.HTTPMessage) -> Optional[str]:
+    # If-Range only accepts strong entity tags, weak ones fall back to the date.
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+
+def _load_download_state(state_path: str, url: str) -> Optional[Dict]:
+    try:
+        with open(state_path) as f:
+            state = json_.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get("url") != url or not state.get("validator"):
+        return None
+    return state
+
+
+def _save_download_state(state_path: str, state: Dict) -> None:
+    with open(state_path, "w") as f:
+        json_.dump(state, f)
+
+
+def _remove_files(*paths: str) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class HTTPCache:
+    """
+    Private HTTP cache for GET responses, stored as files on disk.
+
+    Responses are cached following their Cache-Control and Expires headers.
+    Fresh entries are served without touching the network. Stale entries that
+    have an ETag or Last-Modified validator are revalidated with
+    If-None-Match/If-Modified-Since, so an unchanged resource costs a 304
+    without a body. Each entry is one file holding its metadata and the
+    decoded body, and the least recently used entries are evicted when the
+    cache grows past max_size_bytes.
+
+    Args:
+        path (Optional[str]): Directory of the cache files. Defaults to an
+            "http" directory inside config.get_cache_path().
+        max_size_bytes (int): Maximum total size of the cache on disk.
+            Defaults to 50 MiB.
+
+    Raises:
+        ValueError: If max_size_bytes is not positive.
+
+    Example:
+        >>> from src.ut_components.http import HTTPCache, get
+        >>>
+        >>> # Use the default cache in the app cache directory
+        >>> feed = get("https://example.com/feed.json", cache=True).json()
+        >>>
+        >>> # Or a dedicated one, e.g. for thumbnails
+        >>> thumbnails = HTTPCache(os.path.join(get_cache_path(), "thumbnails"), max_size_bytes=200 * 1024 * 1024)
+        >>> image = get(thumbnail_url, cache=thumbnails).data
+    """
+
+    def __init__(self, path: Optional[str] = None, max_size_bytes: int = 50 * 1024 * 1024) -> None:
+        if max_size_bytes <= 0:
+            raise ValueError("max_size_bytes must be positive")
+        if path is None:
+            from .config import get_cache_path
+
+            path = os.path.join(get_cache_path(), "http")
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+    def delete(self, url: str) -> None:
+        """
+        Remove the cached response of a URL, if any.
+
+        Args:
+            url (str): The URL as it was passed to get(), query string included.
+        """
+        with self._lock:
+            removed = self._remove(self._entry_path(url))
+            if self._size is not None:
+                self._size -= removed
+
+    def clear(self) -> None:
+        """
+        Remove every cached response.
+        """
+        with self._lock:
+            for name in self._entry_names():
+                self._remove(os.path.join(self.path, name))
+            self._size = 0
+
+    def _entry_path(self, url: str) -> str:
+        return os.path.join(self.path, f"{hashlib.sha256(url.encode()).hexdigest()}.cache")
+
+    def _entry_names(self) -> List[str]:
+        try:
+            return [name for name in os.listdir(self.path) if name.endswith(".cache")]
+        except FileNotFoundError:
+            return []
+
+    def _remove(self, entry_path: str) -> int:
+        try:
+            size = os.path.getsize(entry_path)
+            os.remove(entry_path)
+        except FileNotFoundError:
+            return 0
+        return size
+
+    def _lookup(self, url: str, headers: Dict[str, str]) -> Optional[Tuple[Dict, bytes]]:
+        entry_path = self._entry_path(url)
+        try:
+            with open(entry_path, "rb") as f:
+                meta = json_.loads(f.readline())
+                if not _vary_matches(meta["vary"], headers):
+                    return None
+                body = f.read()
+            # The modification time orders entries for eviction.
+            os.utime(entry_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        if len(body) != meta["size"]:
+            return None
+        return meta, body
+
+    def _store(
+        self,
+        url: str,
+        request_headers: Dict[str, str],
+        response_url: str,
+        response_headers: http.client.HTTPMessage,
+        body: bytes,
+        request_time: float,
+    ) -> None:
+        directives = _cache_control(response_headers.get_all("Cache-Control") or [])
+        vary = [name.strip().lower() for value in response_headers.get_all("Vary") or [] for name in value.split(",")]
+        born_at, expires_at = _freshness(response_headers, directives, request_time)
+        if (
+            "no-store" in directives
+            or "*" in vary
+            or len(body) > self.max_size_bytes
+            or (
+                expires_at <= time.time()
+                and not (response_headers.get("ETag") or response_headers.get("Last-Modified"))
+            )
+        ):
+            self.delete(url)
+            return
+
+        request_values = {name.lower(): value for name, value in request_headers.items()}
+        meta = {
+            "url": response_url,
+            "headers": [
+                [name, value] for name, value in response_headers.items() if name.lower() not in _UNCACHED_HEADERS
+            ],
+            "vary": {name: request_values.get(name) for name in vary if name},
+            "born_at": born_at,
+            "expires_at": expires_at,
+            "size": len(body),
+        }
+        entry = json_.dumps(meta).encode() + b"\n" + body
+
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            if self._size is None:
+                self._size = sum(self._file_size(name) for name in self._entry_names())
+            entry_path = self._entry_path(url)
+            temp_path = f"{entry_path}.{uuid.uuid4().hex}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(entry)
+            self._size -= self._file_size(os.path.basename(entry_path))
+            os.replace(temp_path, entry_path)
+            self._size += len(entry)
+            if self._size > self.max_size_bytes:
+                self._evict()
+
+    def _file_size(self, name: str) -> int:
+        try:
+            return os.path.getsize(os.path.join(self.path, name))
+        except FileNotFoundError:
+            return 0
+
+    def _evict(self) -> None:
+        entries = []
+        for name in self._entry_names():
+            try:
+                entries.append((os.path.getmtime(os.path.join(self.path, name)), name))
+            except FileNotFoundError:
+                continue
+        for _, name in sorted(entries):
+            if self._size is None or self._size <= self.max_size_bytes:
+                break
+            self._size -= self._remove(os.path.join(self.path, name))
+
+
+_DEFAULT_CACHE: Optional[HTTPCache] = None
+_DEFAULT_CACHE_LOCK = threading.Lock()
+# Hop-by-hop and body framing headers, which do not describe the decoded body
+# kept in the cache.
+_UNCACHED_HEADERS = ("connection", "keep-alive", "transfer-encoding", "content-encoding", "content-length")
+# Requests with these headers already ask the server for something the cache
+# cannot answer with a stored full response.
+_CONDITIONAL_HEADERS = {"if-none-match", "if-modified-since", "if-match", "if-unmodified-since", "if-range", "range"}
+
+
+def _get_default_cache() -> HTTPCache:
+    global _DEFAULT_CACHE
+    with _DEFAULT_CACHE_LOCK:
+        if _DEFAULT_CACHE is None:
+            _DEFAULT_CACHE = HTTPCache()
+        return _DEFAULT_CACHE
+
+
+def _cached_get(
+    send: Callable[..., Response], url: str, headers: Optional[Dict[str, str]], cache: Union[bool, HTTPCache]
+) -> Response:
+    if cache is True:
+        cache = _get_default_cache()
+    request_headers = dict(headers or {})
+    names = {name.lower() for name in request_headers}
+    directives = _cache_control([value for name, value in request_headers.items() if name.lower() == "cache-control"])
+    if not isinstance(cache, HTTPCache) or "no-store" in directives or names & _CONDITIONAL_HEADERS:
+        return send(url, method="GET", headers=request_headers)
+
+    entry = cache._lookup(url, request_headers)
+    conditional_headers = request_headers
+    if entry is not None:
+        meta, body = entry
+        max_age = directives.get("max-age")
+        no_cache = "no-cache" in directives or any(
+            name.lower() == "pragma" and "no-cache" in value.lower() for name, value in request_headers.items()
+        )
+        if (
+            not no_cache
+            and time.time() < meta["expires_at"]
+            and (max_age is None or not max_age.isdigit() or time.time() - meta["born_at"] <= int(max_age))
+        ):
+            return _cached_response(meta, body, _cached_headers(meta["headers"]))
+        validators = {}
+        for name, value in meta["headers"]:
+            if name.lower() == "etag":
+                validators["If-None-Match"] = value
+            elif name.lower() == "last-modified":
+                validators["If-Modified-Since"] = value
+        conditional_headers = _merge_headers(request_headers, validators)
+
+    request_time = time.time()
+    response = send(url, method="GET", headers=conditional_headers)
+    if entry is not None and response.status_code == 304:
+        # The 304 headers update the stored ones, the body is the cached one.
+        updates = {name.lower() for name in response.headers.keys()}
+        stored = [(name, value) for name, value in meta["headers"] if name.lower() not in updates]
+        merged = _cached_headers(stored + [item for item in response.headers.items()])
+        cache._store(url, request_headers, meta["url"], merged, body, request_time)
+        return _cached_response(meta, body, merged)
+    if response.status_code in (200, 203):
+        cache._store(url, request_headers, response.url, response.headers, response.data, request_time)
+    return response
+
+
+def _cached_headers(items: List[Tuple[str, str]]) -> http.client.HTTPMessage:
+    headers = http.client.HTTPMessage()
+    for name, value in items:
+        if name.lower() not in _UNCACHED_HEADERS:
+            headers[name] = value
+    return headers
+
+
+def _cached_response(meta: Dict, body: bytes, headers: http.client.HTTPMessage) -> Response:
+    headers["Content-Length"] = str(len(body))
+    return Response(meta["url"], True, 200, body, headers)
+
+
+def _vary_matches(vary: Dict[str, Optional[str]], headers: Dict[str, str]) -> bool:
+    values = {name.lower(): value for name, value in headers.items()}
+    return all(values.get(name) == value for name, value in vary.items())
+
+
+def _cache_control(values: List[str]) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for value in values:
+        for part in value.split(","):
+            name, separator, argument = part.strip().partition("=")
+            if name:
+                directives[name.lower()] = argument.strip('"') if separator else None
+    return directives
+
+
+def _freshness(
+    headers: http.client.HTTPMessage, directives: Dict[str, Optional[str]], request_time: float
+) -> Tuple[float, float]:
+    """
+    Return when a response was generated and until when it is fresh, as
+    timestamps of the local clock (RFC 9111 section 4.2).
+    """
+    date = _http_date(headers.get("Date")) or request_time
+    age = headers.get("Age", "")
+    corrected_age = max(0.0, request_time - date, float(age) if age.isdigit() else 0.0)
+    born_at = request_time - corrected_age
+
+    max_age = directives.get("max-age")
+    expires = headers.get("Expires")
+    last_modified = _http_date(headers.get("Last-Modified"))
+    if "no-cache" in directives:
+        lifetime = 0.0
+    elif max_age is not None:
+        lifetime = float(max_age) if max_age.isdigit() else 0.0
+    elif expires is not None:
+        expires_at = _http_date(expires)
+        lifetime = expires_at - date if expires_at is not None else 0.0
+    elif last_modified is not None:
+        # Heuristic freshness: a tenth of the time since the last change.
+        lifetime = min((date - last_modified) / 10, _HEURISTIC_FRESHNESS_SECONDS)
+    else:
+        lifetime = 0.0
+    return born_at, born_at + max(lifetime, 0.0)
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
 
 
 def post_file(
     url: str,
-    file_data: bytes,
-    file_name: str,
-    file_field: str,
+    file_data: Optional[Union[str, bytes, BinaryIO]] = None,
+    file_name: Optional[str] = None,
+    file_field: Optional[str] = None,
     form_fields: Optional[Dict[str, str]] = None,
     headers: Optional[Dict[str, str]] = None,
+    files: Optional[Dict[str, Union[str, BinaryIO, Tuple[str, Union[str, bytes, BinaryIO]]]]] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    timeout: _Timeout = _DEFAULT_TIMEOUT,
+    retry: Optional[Retry] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
 ) -> Response:
     """
     Upload a file to a server using multipart/form-data encoding.
@@ -480,18 +2295,43 @@ def post_file(
     and can include additional form fields alongside the file. This is commonly
     used for uploading images, documents, or other files to web services.
 
+    The body is streamed: files given as paths or file objects are read one
+    chunk at a time while they are sent, with Content-Length computed up
+    front, so large photos and videos are uploaded without loading them in
+    memory.
+
     Args:
         url (str): The target URL for the file upload.
-        file_data (bytes): The file content as bytes. You need to read the file
-            into memory before passing it to this function.
-        file_name (str): The name of the file being uploaded. Used for MIME type
-            detection and sent to the server as the filename.
-        file_field (str): The form field name for the file. This is the parameter
-            name the server expects for the file upload.
+        file_data (Optional[Union[str, bytes, BinaryIO]]): The file to upload,
+            as bytes, a path or a binary file object read from its current
+            position. Defaults to None.
+        file_name (Optional[str]): The name of the file being uploaded. Used for
+            MIME type detection and sent to the server as the filename. Defaults
+            to the name of the path or file object.
+        file_field (Optional[str]): The form field name for the file. This is the
+            parameter name the server expects for the file upload. Required with
+            file_data.
         form_fields (Optional[Dict[str, str]]): Additional form fields to include
             with the file upload. These are sent as regular form data. Defaults to None.
         headers (Optional[Dict[str, str]]): Additional HTTP headers to include.
             The Content-Type header is automatically set with the boundary. Defaults to None.
+        files (Optional[Dict[str, Union[str, BinaryIO, Tuple[str, Union[str, bytes, BinaryIO]]]]]):
+            More files to upload in the same request, by form field name. Each
+            value is a path, a file object, or a (file_name, content) tuple.
+            Defaults to None.
+        on_progress (Optional[Callable[[int, int], None]]): Called as the body
+            is sent with the bytes sent so far and the total body size.
+            Defaults to None.
+        timeout (Optional[Union[float, Tuple[Optional[float], Optional[float]]]]):
+            Connect and read timeout, see request(). Defaults to (10, 60).
+        retry (Optional[Retry]): Policy for retrying transient failures.
+            Defaults to None, which does not retry.
+        circuit_breaker (Optional[CircuitBreaker]): Breaker that fails requests
+            fast while their host is down. Defaults to None.
+
+    Raises:
+        ValueError: If neither file_data nor files is given, or file_data is
+            given without file_field.
 
     Returns:
         Response: A Response object containing the server's response.
@@ -526,33 +2366,291 @@ def post_file(
         ...     },
         ...     headers={"Authorization": "Bearer token123"}
         ... )
+        >>>
+        >>> # Stream several files from disk with progress
+        >>> response = post_file(
+        ...     url="https://api.example.com/assets",
+        ...     files={"video": "/home/phablet/Videos/clip.mp4", "thumbnail": ("thumb.jpg", thumbnail_bytes)},
+        ...     on_progress=lambda sent, total: pyotherside.send("upload-progress", sent / total),
+        ... )
     """
-    boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
-    content_type = f"multipart/form-data; boundary={boundary}"
+    body, request_headers = _multipart_request(
+        file_data, file_name, file_field, form_fields, headers, files, on_progress
+    )
+    return request(
+        url,
+        method="POST",
+        data=body,
+        headers=request_headers,
+        timeout=timeout,
+        retry=retry,
+        circuit_breaker=circuit_breaker,
+    )
 
-    mime_type = guess_type(file_name)[0] or "application/octet-stream"
 
-    body_parts = []
+class _CookieResponse:
+    # http.cookiejar reads response headers through info(), like urllib responses.
+    def __init__(self, headers: http.client.HTTPMessage) -> None:
+        self._headers = headers
 
-    if form_fields:
-        for field_name, field_value in form_fields.items():
-            body_parts.append(f"--{boundary}".encode())
-            body_parts.append(f'Content-Disposition: form-data; name="{field_name}"'.encode())
-            body_parts.append(b"")
-            body_parts.append(str(field_value).encode())
+    def info(self) -> http.client.HTTPMessage:
+        return self._headers
 
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(f'Content-Disposition: form-data; name="{file_field}"; filename="{file_name}"'.encode())
-    body_parts.append(f"Content-Type: {mime_type}".encode())
-    body_parts.append(b"")
-    body_parts.append(file_data)
 
-    body_parts.append(f"--{boundary}--".encode())
+class Session:
+    """
+    Reusable HTTP client with shared headers, cookies, authentication and connections.
 
-    body = b"\r\n".join(body_parts)
+    A session keeps state that would otherwise be rebuilt on every call:
+    default headers sent with each request, a cookie jar filled from
+    Set-Cookie responses, a base URL relative paths are resolved against, an
+    authentication hook and its own connection pool. It exposes the same
+    request/get/post/put/delete/post_file functions as the module, returning
+    the same Response objects, which makes it a good base for API clients.
 
-    request_headers = {"Content-Type": content_type}
-    if headers:
-        request_headers.update(headers)
+    Attributes:
+        base_url (Optional[str]): URL relative request URLs are joined with.
+        headers (Dict[str, str]): Headers sent with every request. Headers
+            passed to a call override them.
+        auth: A (username, password) tuple for HTTP Basic authentication, or
+            a callable receiving (method, url, headers) before every request,
+            redirects included, that can add or change headers.
+        cookies (http.cookiejar.CookieJar): Cookies stored from responses and
+            sent back to matching URLs.
+        pool (ConnectionPool): Keep-alive connections used by this session.
+        timeout: Connect and read timeout of every request, see request().
+        retry (Optional[Retry]): Policy for retrying transient failures.
+        circuit_breaker (Optional[CircuitBreaker]): Breaker that fails requests
+            fast while their host is down.
+
+    Example:
+        >>> from src.ut_components.http import Session
+        >>>
+        >>> with Session(
+        ...     base_url="https://immich.example.com/api/",
+        ...     headers={"Accept": "application/json"},
+        ...     auth=lambda method, url, headers: headers.update({"x-api-key": token}),
+        ... ) as session:
+        ...     albums = session.get("albums").json()
+        ...     session.post("albums", json={"albumName": "Holidays"})
+    """
 
-    return request(url, method="POST", data=body, headers=request_headers)
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        auth: Optional[Union[Tuple[str, str], Callable[[str, str, Dict[str, str]], None]]] = None,
+        cookies: Optional[http.cookiejar.CookieJar] = None,
+        pool: Optional[ConnectionPool] = None,
+        timeout: _Timeout = _DEFAULT_TIMEOUT,
+        retry: Optional[Retry] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        """
+        Initialize a session.
+
+        Args:
+            base_url (Optional[str]): URL relative request URLs are joined with,
+                such as "https://api.example.com/v1/". Defaults to None.
+            headers (Optional[Dict[str, str]]): Headers sent with every request.
+                Defaults to None.
+            auth (Optional[Union[Tuple[str, str], Callable[[str, str, Dict[str, str]], None]]]):
+                A (username, password) tuple for HTTP Basic authentication, sent
+                only to the host of the requested URL, or a callable receiving
+                (method, url, headers) before every request. Defaults to None.
+            cookies (Optional[http.cookiejar.CookieJar]): Cookie jar to use, for
+                example a FileCookieJar to keep cookies across restarts.
+                Defaults to a new in-memory jar.
+            pool (Optional[ConnectionPool]): Connection pool to use. Defaults to
+                a new pool owned by the session.
+            timeout (Optional[Union[float, Tuple[Optional[float], Optional[float]]]]):
+                Seconds to wait for the connection and for each read from it, or
+                a (connect, read) tuple. None waits forever. Defaults to (10, 60).
+            retry (Optional[Retry]): Policy for retrying transient failures.
+                Defaults to None, which does not retry.
+            circuit_breaker (Optional[CircuitBreaker]): Breaker that fails
+                requests fast while their host is down. Defaults to None.
+        """
+        self.base_url = base_url
+        self.headers = dict(headers or {})
+        self.auth = auth
+        self.cookies = cookies if cookies is not None else http.cookiejar.CookieJar()
+        self.pool = pool if pool is not None else ConnectionPool()
+        self.timeout = timeout
+        self.retry = retry
+        self.circuit_breaker = circuit_breaker
+
+    def request(
+        self,
+        url: str,
+        method: str,
+        data: Optional[Union[bytes, Iterable[bytes]]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        follow_redirects: bool = True,
+        max_redirects: int = 10,
+        stream: bool = False,
+    ) -> Response:
+        """
+        Perform an HTTP request with the session's state.
+
+        Same as the module level request(), with the session's base URL,
+        headers, cookies, authentication, connection pool, timeout, retry
+        policy and circuit breaker applied.
+
+        Args:
+            url (str): Absolute URL, or URL relative to base_url.
+            method (str): HTTP method (GET, POST, PUT, DELETE, PATCH, etc.).
+            data (Optional[Union[bytes, Iterable[bytes]]]): Request body as bytes,
+                or an iterable of byte chunks re-iterated on resend. Defaults to None.
+            headers (Optional[Dict[str, str]]): Headers for this request, on top
+                of the session headers. Defaults to None.
+            follow_redirects (bool): Whether to automatically follow HTTP
+                redirects. Defaults to True.
+            max_redirects (int): Maximum number of redirects to follow before
+                failing. Defaults to 10.
+            stream (bool): Return as soon as the headers arrive, and read the
+                body later with Response.iter_content(). Defaults to False.
+
+        Returns:
+            Response: A Response object containing the result of the HTTP request.
+        """
+        return _request(
+            self.pool,
+            self._url(url),
+            method,
+            data,
+            _merge_headers(self.headers, headers),
+            follow_redirects,
+            max_redirects,
+            session=self,
+            stream=stream,
+            timeout=self.timeout,
+            retry=self.retry,
+            circuit_breaker=self.circuit_breaker,
+        )
+
+    def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+        cache: Union[bool, HTTPCache] = False,
+    ) -> Response:
+        """
+        Perform a GET request, see the module level get().
+
+        Cached responses are keyed on the absolute URL, so sessions with
+        different base URLs never share entries. Headers added by the auth
+        hook are not known to the cache and are not part of Vary matching,
+        use a separate HTTPCache per identity when responses depend on them.
+        """
+        if cache and not stream:
+            return _cached_get(self.request, self._url(_with_params(url, params)), headers, cache)
+        return self.request(_with_params(url, params), method="GET", headers=headers, stream=stream)
+
+    def get_many(
+        self,
+        urls_or_requests: Iterable[Union[str, Dict]],
+        max_concurrency: int = 8,
+        as_completed: bool = False,
+    ) -> Union[List[Response], Iterator[Tuple[int, Response]]]:
+        """
+        Perform several GET requests in parallel, see the module level get_many().
+        """
+        return _get_many(self.get, self.pool, self._url, urls_or_requests, max_concurrency, as_completed)
+
+    def download(
+        self,
+        url: str,
+        dest_path: str,
+        chunk_size: int = 65536,
+        on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        resume: bool = True,
+        segments: int = 1,
+    ) -> Response:
+        """
+        Download a URL to a file, see the module level download().
+        """
+        return _download(self.request, url, dest_path, chunk_size, on_progress, headers, resume, segments)
+
+    def post(
+        self, url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None, compress: bool = False
+    ) -> Response:
+        """
+        Perform a POST request, see the module level post().
+        """
+        data, request_headers = _json_request(json, headers, compress)
+        return self.request(url, method="POST", data=data, headers=request_headers)
+
+    def put(
+        self, url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None, compress: bool = False
+    ) -> Response:
+        """
+        Perform a PUT request, see the module level put().
+        """
+        data, request_headers = _json_request(json, headers, compress)
+        return self.request(url, method="PUT", data=data, headers=request_headers)
+
+    def delete(self, url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None) -> Response:
+        """
+        Perform a DELETE request, see the module level delete().
+        """
+        data, request_headers = _json_request(json, headers)
+        return self.request(url, method="DELETE", data=data, headers=request_headers)
+
+    def post_file(
+        self,
+        url: str,
+        file_data: Optional[Union[str, bytes, BinaryIO]] = None,
+        file_name: Optional[str] = None,
+        file_field: Optional[str] = None,
+        form_fields: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        files: Optional[Dict[str, Union[str, BinaryIO, Tuple[str, Union[str, bytes, BinaryIO]]]]] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Response:
+        """
+        Upload files with multipart/form-data, see the module level post_file().
+        """
+        body, request_headers = _multipart_request(
+            file_data, file_name, file_field, form_fields, headers, files, on_progress
+        )
+        return self.request(url, method="POST", data=body, headers=request_headers)
+
+    def close(self) -> None:
+        """
+        Close the idle connections of the session's pool.
+        """
+        self.pool.close()
+
+    def __enter__(self) -> "Session":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _url(self, url: str) -> str:
+        if self.base_url:
+            return urllib.parse.urljoin(self.base_url, url)
+        return url
+
+    def _prepare(self, method: str, url: str, headers: Dict[str, str], original_url: str) -> Dict[str, str]:
+        prepared = dict(headers)
+        cookie_request = urllib.request.Request(url)
+        self.cookies.add_cookie_header(cookie_request)
+        cookie = cookie_request.get_header("Cookie")
+        if cookie:
+            prepared = _merge_headers(prepared, {"Cookie": cookie})
+        if callable(self.auth):
+            self.auth(method, url, prepared)
+        elif self.auth is not None:
+            # Credentials are not sent along when a redirect leaves the host.
+            if urllib.parse.urlsplit(url).netloc == urllib.parse.urlsplit(original_url).netloc:
+                credentials = base64.b64encode(f"{self.auth[0]}:{self.auth[1]}".encode()).decode()
+                prepared = _merge_headers(prepared, {"Authorization": f"Basic {credentials}"})
+        return prepared
+
+    def _extract_cookies(self, url: str, response: http.client.HTTPResponse) -> None:
+        self.cookies.extract_cookies(_CookieResponse(response.msg), urllib.request.Request(url))  # type: ignore
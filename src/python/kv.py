@@ -14,15 +14,55 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import hashlib
 import json
 import os
+import random
 import sqlite3
 from datetime import datetime, timedelta
-from typing import Any, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from .config import get_config_path
 
 
+def jitter_ttl(ttl_seconds: Optional[int], jitter: Optional[float], key: Optional[str] = None) -> Optional[int]:
+    """
+    Shorten a TTL by a random or key-derived fraction of itself.
+
+    Spreads the expiration of entries written at the same moment over a
+    window, instead of having them all expire, and be recomputed, together.
+    The result is between ttl_seconds * (1 - jitter) and ttl_seconds.
+
+    Args:
+        ttl_seconds (Optional[int]): The TTL to jitter. None and 0 (no
+            expiration) are returned unchanged.
+        jitter (Optional[float]): Maximum fraction of the TTL to remove,
+            between 0 and 1. None returns ttl_seconds unchanged.
+        key (Optional[str]): If given, the fraction is derived from a hash of
+            the key instead of a random number, so the same key always gets
+            the same TTL.
+
+    Returns:
+        Optional[int]: The jittered TTL in seconds, at least 1.
+
+    Raises:
+        ValueError: If jitter is not between 0 and 1.
+
+    Example:
+        >>> jitter_ttl(3600, 0.1)  # Between 3240 and 3600
+        >>> jitter_ttl(3600, 0.1, key="album:1")  # Same value on every call
+    """
+    if not ttl_seconds or jitter is None:
+        return ttl_seconds
+    if not 0 <= jitter < 1:
+        raise ValueError("ttl jitter must be between 0 and 1")
+    if key is None:
+        fraction = random.random()
+    else:
+        fraction = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big") / 2**64
+    return max(1, ttl_seconds - int(ttl_seconds * jitter * fraction))
+
+
 class KV:
     """
     A persistent key-value storage system with TTL (time-to-live) support.
@@ -99,13 +139,39 @@ class KV:
         self.cache_values = []
         self.cache_row_count = 0
 
-    def _encode_value(self, value: Any) -> str:
+    def encode_value(self, value: Any) -> str:
+        """
+        Serialize a value into the text stored in the database.
+
+        Use it together with put_encoded() when the serialized form is also
+        needed by the caller, for example to measure its size, so the value
+        is only JSON-encoded once.
+
+        Args:
+            value (Any): Any JSON-serializable Python object.
+
+        Returns:
+            str: The serialized value, as stored in the database.
+
+        Example:
+            >>> with KV() as kv:
+            ...     encoded = kv.encode_value({"items": [1, 2, 3]})
+            ...     print(len(encoded))  # 30
+            ...     kv.put_encoded("numbers", encoded)
+        """
         return json.dumps({"value": value})
 
     def _decode_value(self, value: str) -> Any:
         return json.loads(value).get("value", None)
 
-    def put(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+    def put(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: Optional[int] = None,
+        ttl_jitter: Optional[float] = None,
+        deterministic_jitter: bool = False,
+    ) -> None:
         """
         Store a key-value pair in the database with optional TTL.
 
@@ -121,6 +187,15 @@ class KV:
             ttl_seconds (Optional[int]): Time-to-live in seconds. If provided,
                 the entry will automatically expire after this duration.
                 Defaults to None (no expiration).
+            ttl_jitter (Optional[float]): Fraction of ttl_seconds, between 0 and 1,
+                by which the TTL is randomly shortened, so entries written together
+                do not all expire at the same moment. Defaults to None (no jitter).
+            deterministic_jitter (bool): Derive the jitter from a hash of the key
+                instead of a random number, so rewriting a key always gives it the
+                same lifetime. Defaults to False.
+
+        Raises:
+            ValueError: If ttl_jitter is not between 0 and 1.
 
         Example:
             >>> kv = KV()
@@ -138,8 +213,56 @@ class KV:
             >>> # Store with expiration (1 hour)
             >>> kv.put("session:token", "abc123xyz", ttl_seconds=3600)
             >>>
+            >>> # Expire somewhere between 54 and 60 minutes from now
+            >>> kv.put("feed:page:1", items, ttl_seconds=3600, ttl_jitter=0.1)
+            >>>
             >>> kv.close()
         """
+        self.put_encoded(
+            key,
+            self.encode_value(value),
+            ttl_seconds=ttl_seconds,
+            ttl_jitter=ttl_jitter,
+            deterministic_jitter=deterministic_jitter,
+        )
+
+    def put_encoded(
+        self,
+        key: str,
+        encoded_value: str,
+        ttl_seconds: Optional[int] = None,
+        ttl_jitter: Optional[float] = None,
+        deterministic_jitter: bool = False,
+    ) -> None:
+        """
+        Store a value previously serialized with encode_value().
+
+        Behaves like put(), but skips serialization. This avoids encoding
+        large values twice when the caller already needed the serialized form.
+
+        Args:
+            key (str): The unique identifier for the value.
+            encoded_value (str): The output of encode_value().
+            ttl_seconds (Optional[int]): Time-to-live in seconds. If provided,
+                the entry will automatically expire after this duration.
+                Defaults to None (no expiration).
+            ttl_jitter (Optional[float]): Fraction of ttl_seconds, between 0 and 1,
+                by which the TTL is randomly shortened, so entries written together
+                do not all expire at the same moment. Defaults to None (no jitter).
+            deterministic_jitter (bool): Derive the jitter from a hash of the key
+                instead of a random number, so rewriting a key always gives it the
+                same lifetime. Defaults to False.
+
+        Raises:
+            ValueError: If ttl_jitter is not between 0 and 1.
+
+        Example:
+            >>> with KV() as kv:
+            ...     encoded = kv.encode_value(large_payload)
+            ...     if len(encoded) < 1_000_000:
+            ...         kv.put_encoded("payload", encoded, ttl_seconds=3600)
+        """
+        ttl_seconds = jitter_ttl(ttl_seconds, ttl_jitter, key if deterministic_jitter else None)
         if ttl_seconds:
             ttl = int((datetime.now() + timedelta(seconds=ttl_seconds)).timestamp())
         else:
@@ -149,7 +272,7 @@ class KV:
             """
             INSERT OR REPLACE INTO kv (key, value, ttl) VALUES (?, ?, ?)
         """,
-            (key, self._encode_value(value), ttl),
+            (key, encoded_value, ttl),
         )
         self.conn.commit()
 
@@ -224,6 +347,80 @@ class KV:
 
         return self._decode_value(result)
 
+    def get_entry(self, key: str) -> Optional[Tuple[Any, Optional[int]]]:
+        """
+        Retrieve a value together with its expiration timestamp.
+
+        Unlike get(), this method distinguishes a missing or expired key from a
+        stored value that happens to be None or falsy, and also reports when
+        the entry expires. Useful for caches layered on top of the KV store.
+
+        Args:
+            key (str): The key to look up in the storage.
+
+        Returns:
+            Optional[Tuple[Any, Optional[int]]]: None if the key does not exist
+            or has expired. Otherwise a tuple of (value, expires_at), where
+            expires_at is the expiration unix timestamp in seconds, or None if
+            the entry never expires.
+
+        Example:
+            >>> with KV() as kv:
+            ...     kv.put("session:token", None, ttl_seconds=3600)
+            ...     entry = kv.get_entry("session:token")
+            ...     if entry is not None:
+            ...         value, expires_at = entry
+            ...         print(value, expires_at)  # None 1735689600
+        """
+        now_seconds = int(datetime.now().timestamp())
+
+        self.cursor.execute(
+            """
+            SELECT value, ttl FROM kv WHERE key = ? AND (ttl IS NULL OR ttl > ?)
+        """,
+            (key, now_seconds),
+        )
+        result = self.cursor.fetchone()
+        if not result or not result[0]:
+            return None
+        return self._decode_value(result[0]), result[1]
+
+    def get_entries(self, keys: List[str]) -> Dict[str, Tuple[Any, Optional[int]]]:
+        """
+        Retrieve several values and their expiration timestamps at once.
+
+        Batch version of get_entry(). Keys are looked up with a few IN queries
+        instead of one query per key. Missing and expired keys are left out
+        of the result.
+
+        Args:
+            keys (List[str]): The keys to look up.
+
+        Returns:
+            Dict[str, Tuple[Any, Optional[int]]]: A mapping from each found key
+            to a tuple of (value, expires_at), where expires_at is the expiration
+            unix timestamp in seconds, or None if the entry never expires.
+
+        Example:
+            >>> with KV() as kv:
+            ...     entries = kv.get_entries(["user:1", "user:2", "user:3"])
+            ...     missing = [k for k in ["user:1", "user:2", "user:3"] if k not in entries]
+        """
+        now_seconds = int(datetime.now().timestamp())
+        entries: Dict[str, Tuple[Any, Optional[int]]] = {}
+
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            placeholders = ",".join("?" for _ in chunk)
+            self.cursor.execute(
+                f"SELECT key, value, ttl FROM kv WHERE key IN ({placeholders}) AND (ttl IS NULL OR ttl > ?)",
+                [*chunk, now_seconds],
+            )
+            for key, value, ttl in self.cursor.fetchall():
+                if value:
+                    entries[key] = (self._decode_value(value), ttl)
+        return entries
+
     def get_partial(self, beginning: str) -> List[Tuple[str, Any]]:
         """
         Retrieve all key-value pairs where keys start with a given prefix.
@@ -423,6 +620,85 @@ class KV:
         )
         self.conn.commit()
 
+    def delete_many(self, keys: List[str]) -> None:
+        """
+        Delete several keys in a single transaction.
+
+        Missing keys are ignored, like in delete().
+
+        Args:
+            keys (List[str]): The keys of the entries to delete.
+
+        Example:
+            >>> with KV() as kv:
+            ...     kv.delete_many(["album:1", "album:2", "album:3"])
+        """
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            placeholders = ",".join("?" for _ in chunk)
+            self.cursor.execute(f"DELETE FROM kv WHERE key IN ({placeholders})", chunk)
+        self.conn.commit()
+
+    def get_prefix_keys(self, prefix: str) -> List[str]:
+        """
+        List the keys that start with a given prefix, in key order.
+
+        Unlike get_partial(), the match is case-sensitive and treats "%" and
+        "_" literally, which lets SQLite answer it from the primary key index
+        instead of scanning the whole table. Expired keys are left out.
+
+        Args:
+            prefix (str): The prefix keys must start with.
+
+        Returns:
+            List[str]: The matching keys.
+
+        Example:
+            >>> with KV() as kv:
+            ...     kv.put("album:1", "Holidays")
+            ...     kv.put("album:2", "Birthday")
+            ...     print(kv.get_prefix_keys("album:"))  # ["album:1", "album:2"]
+        """
+        condition, params = self._prefix_range(prefix)
+        now_seconds = int(datetime.now().timestamp())
+        self.cursor.execute(
+            f"SELECT key FROM kv WHERE {condition} AND (ttl IS NULL OR ttl > ?) ORDER BY key",
+            [*params, now_seconds],
+        )
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def delete_prefix(self, prefix: str) -> None:
+        """
+        Delete all key-value pairs whose keys start with a given prefix.
+
+        Unlike delete_partial(), the match is case-sensitive and treats "%"
+        and "_" literally, which lets SQLite delete the rows through the
+        primary key index instead of scanning the whole table. Prefer it for
+        machine generated keys, such as cache entries.
+
+        Args:
+            prefix (str): The prefix keys must start with.
+
+        Example:
+            >>> with KV() as kv:
+            ...     kv.put("cache:user:1", {"name": "Alice"})
+            ...     kv.put("cache:user_1", {"name": "Bob"})
+            ...     kv.delete_prefix("cache:user:")
+            ...     print(kv.get("cache:user_1"))  # {"name": "Bob"}
+        """
+        condition, params = self._prefix_range(prefix)
+        self.cursor.execute(f"DELETE FROM kv WHERE {condition}", params)
+        self.conn.commit()
+
+    @staticmethod
+    def _prefix_range(prefix: str) -> Tuple[str, List[str]]:
+        # Every key starting with prefix sorts between prefix itself and prefix
+        # with its last character incremented, so the lookup is a range scan.
+        if not prefix:
+            return "1", []
+        upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return "key >= ? AND key < ?", [prefix, upper_bound]
+
     def close(self) -> None:
         """
         Close the database connection and commit any pending changes.
@@ -453,7 +729,14 @@ class KV:
     def __exit__(self, exc_type, exc_value, traceback):
         self.close()
 
-    def put_cached(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+    def put_cached(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: Optional[int] = None,
+        ttl_jitter: Optional[float] = None,
+        deterministic_jitter: bool = False,
+    ) -> None:
         """
         Add a key-value pair to the cache for batch insertion.
 
@@ -469,6 +752,15 @@ class KV:
             ttl_seconds (Optional[int]): Time-to-live in seconds. If provided,
                 the entry will automatically expire after this duration.
                 Defaults to None (no expiration).
+            ttl_jitter (Optional[float]): Fraction of ttl_seconds, between 0 and 1,
+                by which the TTL is randomly shortened, so entries written together
+                do not all expire at the same moment. Defaults to None (no jitter).
+            deterministic_jitter (bool): Derive the jitter from a hash of the key
+                instead of a random number, so rewriting a key always gives it the
+                same lifetime. Defaults to False.
+
+        Raises:
+            ValueError: If ttl_jitter is not between 0 and 1.
 
         Example:
             >>> kv = KV()
@@ -487,14 +779,64 @@ class KV:
             ...     kv.put_cached(f"temp:{i}", i, ttl_seconds=300)  # 5 minutes TTL
             >>> kv.commit_cached()
             >>>
+            >>> # Spread expirations of a bulk sync over the last 20% of the TTL
+            >>> for i in range(100):
+            ...     kv.put_cached(f"sync:{i}", i, ttl_seconds=3600, ttl_jitter=0.2)
+            >>> kv.commit_cached()
+            >>>
             >>> kv.close()
         """
+        self.put_cached_encoded(
+            key,
+            self.encode_value(value),
+            ttl_seconds=ttl_seconds,
+            ttl_jitter=ttl_jitter,
+            deterministic_jitter=deterministic_jitter,
+        )
+
+    def put_cached_encoded(
+        self,
+        key: str,
+        encoded_value: str,
+        ttl_seconds: Optional[int] = None,
+        ttl_jitter: Optional[float] = None,
+        deterministic_jitter: bool = False,
+    ) -> None:
+        """
+        Add a value previously serialized with encode_value() to the batch cache.
+
+        Behaves like put_cached(), but skips serialization, like put_encoded()
+        does for put(). Entries are written by commit_cached().
+
+        Args:
+            key (str): The unique identifier for the value.
+            encoded_value (str): The output of encode_value().
+            ttl_seconds (Optional[int]): Time-to-live in seconds. If provided,
+                the entry will automatically expire after this duration.
+                Defaults to None (no expiration).
+            ttl_jitter (Optional[float]): Fraction of ttl_seconds, between 0 and 1,
+                by which the TTL is randomly shortened, so entries written together
+                do not all expire at the same moment. Defaults to None (no jitter).
+            deterministic_jitter (bool): Derive the jitter from a hash of the key
+                instead of a random number, so rewriting a key always gives it the
+                same lifetime. Defaults to False.
+
+        Raises:
+            ValueError: If ttl_jitter is not between 0 and 1.
+
+        Example:
+            >>> with KV() as kv:
+            ...     for item in items:
+            ...         kv.put_cached_encoded(f"item:{item.id}", kv.encode_value(item.data))
+            ...     kv.commit_cached()
+        """
+        ttl_seconds = jitter_ttl(ttl_seconds, ttl_jitter, key if deterministic_jitter else None)
         if ttl_seconds:
             ttl = int((datetime.now() + timedelta(seconds=ttl_seconds)).timestamp())
         else:
             ttl = None
 
-        self.cache_values.extend([key, self._encode_value(value), ttl])
+        self.cache_values.extend([key, encoded_value, ttl])
         self.cache_row_count += 1
 
     def commit_cached(self) -> None:
@@ -533,13 +875,17 @@ class KV:
         if not self.cache_values:
             return
 
-        values = ",".join(["(?, ?, ?)" for _ in range(self.cache_row_count)])
+        # Older SQLite versions allow at most 999 parameters per statement,
+        # so rows are inserted in chunks of 300 inside a single transaction.
+        for start in range(0, self.cache_row_count, 300):
+            chunk = self.cache_values[start * 3 : (start + 300) * 3]
+            values = ",".join(["(?, ?, ?)" for _ in range(len(chunk) // 3)])
 
-        sql = f"""
-            INSERT OR REPLACE INTO kv (key, value, ttl) VALUES {values}
-        """
+            sql = f"""
+                INSERT OR REPLACE INTO kv (key, value, ttl) VALUES {values}
+            """
 
-        self.cursor.execute(sql, self.cache_values)
+            self.cursor.execute(sql, chunk)
         self.conn.commit()
         self.cache_values = []
         self.cache_row_count = 0
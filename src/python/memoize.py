@@ -14,68 +14,626 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import asyncio
+import base64
+import bisect
 import functools
 import hashlib
+import importlib
+import inspect
+import itertools
 import json
-from typing import Any, Callable
+import math
+import os
+import threading
+import time
+import traceback
+import uuid
+import warnings
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from datetime import time as dt_time
+from datetime import timedelta
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
-from .kv import KV
+from .kv import KV, jitter_ttl
+from .utils import short_string
+
+_REFRESH_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_REFRESH_EXECUTOR_LOCK = threading.Lock()
+_PROCESS_TOKEN = short_string()
+_INSTANCE_COUNTER = itertools.count()
+# Process-local identities of receivers for the "instance" scope, kept outside
+# the objects so they are not modified. Unhashable receivers are tracked by
+# id() until they are garbage collected.
+_INSTANCE_TOKENS: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+_INSTANCE_TOKENS_BY_ID: Dict[int, str] = {}
+_INSTANCE_TOKENS_LOCK = threading.Lock()
+
+
+class _MemoryCache:
+    """
+    Bounded in-process cache used as the first tier of memoize.
+
+    Entries are kept in least-recently-used order together with their
+    expiration time, so hits are served without touching SQLite. Every
+    memoized function owns one instance, registered in _MEMORY_CACHES so
+    delete_memoized() and delete_all_memoized() can invalidate it.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, value: Any, expires_at: float) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def delete_many(self, keys: List[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_MEMORY_CACHES: "weakref.WeakSet[_MemoryCache]" = weakref.WeakSet()
+
+
+class _Flight:
+    """
+    A single in-progress computation that concurrent callers can wait on.
+    """
+
+    def __init__(self) -> None:
+        self.owner = threading.get_ident()
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def get(self) -> Any:
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class _SingleFlight:
+    """
+    Coalesces concurrent cache misses on the same key.
+
+    The first caller for a key becomes the leader and computes the result,
+    later callers wait on the leader's _Flight instead of running the
+    function again.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def join(self, key: str) -> Tuple[_Flight, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = _Flight()
+            self._flights[key] = flight
+            return flight, True
+
+    def leave(self, key: str, flight: _Flight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.done.set()
+
+
+_LATENCY_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class _Stats:
+    """
+    Hit, miss and latency counters of one memoized function.
+
+    Latencies are kept in histograms with fixed millisecond buckets, so
+    recording is constant time and memory does not grow with call count.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.kv_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.errors = 0
+        self.rejected_too_large = 0
+        self.rejected_too_cheap = 0
+        self.stored_entries = 0
+        self.stored_bytes = 0
+        self.largest_entry_bytes = 0
+        self.compute_seconds = 0.0
+        self.read_seconds = 0.0
+        self.compute_histogram = [0] * (len(_LATENCY_BUCKETS_MS) + 1)
+        self.read_histogram = [0] * (len(_LATENCY_BUCKETS_MS) + 1)
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_read(self, seconds: float, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.kv_hits += 1
+            self.read_seconds += seconds
+            self.read_histogram[bisect.bisect_left(_LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+
+    def record_compute(self, seconds: float, failed: bool = False) -> None:
+        with self._lock:
+            self.misses += 1
+            if failed:
+                self.errors += 1
+            self.compute_seconds += seconds
+            self.compute_histogram[bisect.bisect_left(_LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+
+    def record_store(self, size: int) -> None:
+        with self._lock:
+            self.stored_entries += 1
+            self.stored_bytes += size
+            self.largest_entry_bytes = max(self.largest_entry_bytes, size)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.kv_hits
+            reads = sum(self.read_histogram)
+            labels = [f"<={bucket}ms" for bucket in _LATENCY_BUCKETS_MS] + [f">{_LATENCY_BUCKETS_MS[-1]}ms"]
+            return {
+                "memory_hits": self.memory_hits,
+                "kv_hits": self.kv_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / (hits + self.misses) if hits + self.misses else 0.0,
+                "coalesced": self.coalesced,
+                "refreshes": self.refreshes,
+                "errors": self.errors,
+                "rejected_too_large": self.rejected_too_large,
+                "rejected_too_cheap": self.rejected_too_cheap,
+                "stored_entries": self.stored_entries,
+                "stored_bytes": self.stored_bytes,
+                "largest_entry_bytes": self.largest_entry_bytes,
+                "compute_seconds": self.compute_seconds,
+                "read_seconds": self.read_seconds,
+                "average_compute_ms": self.compute_seconds * 1000 / self.misses if self.misses else 0.0,
+                "average_read_ms": self.read_seconds * 1000 / reads if reads else 0.0,
+                "compute_latency_ms": dict(zip(labels, self.compute_histogram)),
+                "read_latency_ms": dict(zip(labels, self.read_histogram)),
+            }
+
+
+_STATS: Dict[str, _Stats] = {}
+_STATS_LOCK = threading.Lock()
+
+
+def _get_stats(name: str) -> _Stats:
+    with _STATS_LOCK:
+        if name not in _STATS:
+            _STATS[name] = _Stats()
+        return _STATS[name]
+
+
+def _tag_prefix(tag: str) -> str:
+    if not isinstance(tag, str):
+        raise TypeError(f"memoize tags must be strings, got {type(tag).__name__}")
+    return f"memoize-tag.{hashlib.blake2b(tag.encode(), digest_size=8).hexdigest()}."
+
+
+def _function_event(event_id: str, trigger: Callable[[], Any], execution_interval: Optional[timedelta] = None) -> Any:
+    # Imported here because the event module needs pyotherside, which is
+    # only available when running inside QML.
+    from .event import Event
+
+    class FunctionEvent(Event):
+        def trigger(self, metadata: Optional[Dict]) -> Any:
+            return trigger()
+
+    return FunctionEvent(id=event_id, execution_interval=execution_interval)
+
+
+def _expires_at(ttl_seconds: Optional[int]) -> float:
+    if ttl_seconds:
+        return time.time() + ttl_seconds
+    return math.inf
+
+
+def _type_path(value_type: type) -> str:
+    if "<locals>" in value_type.__qualname__:
+        raise TypeError(f"{value_type.__qualname__} is defined inside a function and cannot be restored")
+    return f"{value_type.__module__}:{value_type.__qualname__}"
+
+
+def _resolve_type(path: str) -> Any:
+    module_name, _, qualname = path.partition(":")
+    resolved: Any = importlib.import_module(module_name)
+    for attribute in qualname.split("."):
+        resolved = getattr(resolved, attribute)
+    if not isinstance(resolved, type):
+        raise TypeError(f"{path} is not a type")
+    return resolved
+
+
+class _CachedError:
+    """
+    A negatively cached exception, stored in place of a result.
+
+    The record holds the exception type path and its arguments, so a fresh
+    exception can be raised on every hit, from memory or from the KV store.
+    """
+
+    def __init__(self, record: Dict) -> None:
+        self.record = record
+
+    @classmethod
+    def from_exception(cls, error: BaseException) -> "_CachedError":
+        args = list(error.args)
+        try:
+            json.dumps(args)
+        except (TypeError, ValueError):
+            args = [str(error)]
+        return cls({"type": f"{type(error).__module__}:{type(error).__qualname__}", "args": args})
+
+    def rebuild(self) -> BaseException:
+        try:
+            error_type = _resolve_type(self.record["type"])
+            if issubclass(error_type, BaseException):
+                return error_type(*self.record["args"])
+        except Exception:
+            pass
+        return RuntimeError(f"{self.record['type']}: {self.record['args']}")
+
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def _encode_result(value: Any) -> Any:
+    """
+    Encode a result into JSON-compatible data, tagging non-JSON types.
+
+    Tagged values are dicts with a "$" key naming the type, so dataclasses,
+    Enums, tuples, sets, bytes and datetimes come back with the same type
+    on a cache hit. Dicts that use "$" as a key, or have non-string keys,
+    are tagged too so they can't be mistaken for a type tag.
+    """
+    value_type = type(value)
+    if value_type in _JSON_SCALARS:
+        return value
+    if value_type is list:
+        return [_encode_result(item) for item in value]
+    if value_type is dict:
+        if "$" not in value and all(type(item_key) is str for item_key in value):
+            return {item_key: _encode_result(item_value) for item_key, item_value in value.items()}
+        return {"$": "dict", "v": [[_encode_result(k), _encode_result(v)] for k, v in value.items()]}
+    if isinstance(value, _CachedError):
+        return {"$": "error", "v": value.record}
+    if isinstance(value, Enum):
+        return {"$": "enum", "t": _type_path(value_type), "v": _encode_result(value.value)}
+    if is_dataclass(value) and not isinstance(value, type):
+        return {
+            "$": "dataclass",
+            "t": _type_path(value_type),
+            "v": {field.name: _encode_result(getattr(value, field.name)) for field in fields(value)},
+        }
+    if isinstance(value, tuple):
+        if hasattr(value, "_fields"):
+            return {"$": "namedtuple", "t": _type_path(value_type), "v": [_encode_result(item) for item in value]}
+        return {"$": "tuple", "v": [_encode_result(item) for item in value]}
+    if isinstance(value, frozenset):
+        return {"$": "frozenset", "v": [_encode_result(item) for item in value]}
+    if isinstance(value, set):
+        return {"$": "set", "v": [_encode_result(item) for item in value]}
+    if isinstance(value, (bytes, bytearray)):
+        return {"$": "bytes", "v": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, datetime):
+        return {"$": "datetime", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {"$": "date", "v": value.isoformat()}
+    if isinstance(value, dt_time):
+        return {"$": "time", "v": value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return {"$": "uuid", "v": value.hex}
+    if isinstance(value, str):
+        return str(value)
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float):
+        return float(value)
+    if isinstance(value, list):
+        return [_encode_result(item) for item in value]
+    if isinstance(value, dict):
+        return _encode_result(dict(value))
+    raise TypeError(f"Object of type {value_type.__name__} cannot be stored by memoize")
+
+
+def _decode_dataclass(path: str, data: Dict) -> Any:
+    dataclass_type = _resolve_type(path)
+    init_values = {}
+    late_values = {}
+    for field in fields(dataclass_type):
+        if field.name not in data:
+            continue
+        if field.init:
+            init_values[field.name] = _decode_result(data[field.name])
+        else:
+            late_values[field.name] = _decode_result(data[field.name])
+    result = dataclass_type(**init_values)
+    for name, value in late_values.items():
+        object.__setattr__(result, name, value)
+    return result
+
+
+def _decode_result(value: Any) -> Any:
+    """
+    Restore a value produced by _encode_result().
+    """
+    if type(value) is list:
+        return [_decode_result(item) for item in value]
+    if type(value) is not dict:
+        return value
+    tag = value.get("$")
+    if tag is None:
+        return {item_key: _decode_result(item_value) for item_key, item_value in value.items()}
+    payload = value["v"]
+    if tag == "dict":
+        return {_decode_result(k): _decode_result(v) for k, v in payload}
+    if tag == "error":
+        return _CachedError(payload)
+    if tag == "enum":
+        return _resolve_type(value["t"])(_decode_result(payload))
+    if tag == "dataclass":
+        return _decode_dataclass(value["t"], payload)
+    if tag == "namedtuple":
+        return _resolve_type(value["t"])(*[_decode_result(item) for item in payload])
+    if tag == "tuple":
+        return tuple(_decode_result(item) for item in payload)
+    if tag == "set":
+        return {_decode_result(item) for item in payload}
+    if tag == "frozenset":
+        return frozenset(_decode_result(item) for item in payload)
+    if tag == "bytes":
+        return base64.b64decode(payload)
+    if tag == "datetime":
+        return datetime.fromisoformat(payload)
+    if tag == "date":
+        return date.fromisoformat(payload)
+    if tag == "time":
+        return dt_time.fromisoformat(payload)
+    if tag == "uuid":
+        return uuid.UUID(payload)
+    raise TypeError(f"unknown memoize type tag {tag!r}")
+
+
+def _get_refresh_executor() -> ThreadPoolExecutor:
+    global _REFRESH_EXECUTOR
+    with _REFRESH_EXECUTOR_LOCK:
+        if _REFRESH_EXECUTOR is None:
+            _REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="memoize-refresh")
+        return _REFRESH_EXECUTOR
+
+
+def _canonicalize(value: Any, parts: List[str]) -> None:
+    value_type = type(value)
+    if value_type is str or value_type is int or value_type is float or value_type is bool or value is None:
+        parts.append(repr(value))
+    elif isinstance(value, Enum):
+        parts.append(f"E{value_type.__module__}.{value_type.__qualname__}:")
+        _canonicalize(value.value, parts)
+    elif isinstance(value, str):
+        parts.append(repr(str(value)))
+    elif isinstance(value, int):
+        parts.append(repr(int(value)))
+    elif isinstance(value, float):
+        parts.append(repr(float(value)))
+    elif isinstance(value, (list, tuple)):
+        parts.append("[" if isinstance(value, list) else "(")
+        for item in value:
+            _canonicalize(item, parts)
+            parts.append(",")
+        parts.append("]" if isinstance(value, list) else ")")
+    elif isinstance(value, dict):
+        parts.append("{")
+        for item_key, item_value in sorted((_canonical_string(k), v) for k, v in value.items()):
+            parts.append(item_key)
+            parts.append(":")
+            _canonicalize(item_value, parts)
+            parts.append(",")
+        parts.append("}")
+    elif isinstance(value, (set, frozenset)):
+        parts.append("S{")
+        parts.extend(f"{item}," for item in sorted(_canonical_string(item) for item in value))
+        parts.append("}")
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        parts.append(f"B{bytes(value).hex()}")
+    elif isinstance(value, (datetime, date, dt_time)):
+        parts.append(f"T{value_type.__name__}:{value.isoformat()}")
+    elif isinstance(value, uuid.UUID):
+        parts.append(f"U{value.hex}")
+    elif isinstance(value, os.PathLike):
+        parts.append(f"P{os.fspath(value)!r}")
+    elif is_dataclass(value) and not isinstance(value, type):
+        parts.append(f"D{value_type.__module__}.{value_type.__qualname__}(")
+        for field in fields(value):
+            parts.append(f"{field.name}=")
+            _canonicalize(getattr(value, field.name), parts)
+            parts.append(",")
+        parts.append(")")
+    else:
+        raise TypeError(
+            f"Object of type {value_type.__name__} cannot be used as a memoize key, pass key= to memoize instead"
+        )
+
+
+def _canonical_string(value: Any) -> str:
+    parts: List[str] = []
+    _canonicalize(value, parts)
+    return "".join(parts)
+
+
+def _instance_token(receiver: Any) -> str:
+    try:
+        weakref.ref(receiver)
+    except TypeError:
+        raise TypeError(
+            f"Object of type {type(receiver).__name__} does not support weak references to track its memoize "
+            "identity, pass instance_key to memoize instead"
+        )
+    try:
+        hash(receiver)
+        hashable = True
+    except TypeError:
+        hashable = False
+    with _INSTANCE_TOKENS_LOCK:
+        token = _INSTANCE_TOKENS.get(receiver) if hashable else _INSTANCE_TOKENS_BY_ID.get(id(receiver))
+        if token is not None:
+            return token
+        token = f"{_PROCESS_TOKEN}.{next(_INSTANCE_COUNTER)}"
+        if hashable:
+            _INSTANCE_TOKENS[receiver] = token
+        else:
+            _INSTANCE_TOKENS_BY_ID[id(receiver)] = token
+            # Forget the id when the receiver dies, a new object may reuse it.
+            weakref.finalize(receiver, _INSTANCE_TOKENS_BY_ID.pop, id(receiver), None)
+        return token
+
+
+def _receiver_scope(receiver: Any, scope: str, instance_key: Optional[Callable[[Any], Any]]) -> Any:
+    owner = receiver if isinstance(receiver, type) else type(receiver)
+    owner_name = f"{owner.__module__}.{owner.__qualname__}"
+    if scope == "class" or isinstance(receiver, type):
+        return owner_name
+    if instance_key is not None:
+        return (owner_name, instance_key(receiver))
+    return (owner_name, _instance_token(receiver))
 
 
 def hash_function_name(func: Callable) -> str:
     """
     Generate a unique hash identifier for a function based on its name and module.
 
-    This helper function creates a SHA1 hash of the function's fully qualified name
-    (module + function name) to uniquely identify functions in the cache system.
-    It ensures that functions with the same name in different modules get
-    different cache keys.
+    This helper function creates a short BLAKE2b hash of the function's fully
+    qualified name (module + qualified function name) to uniquely identify
+    functions in the cache system. It ensures that functions with the same name
+    in different modules or classes get different cache keys. The memoize
+    decorator computes it once, when the function is decorated.
 
     Args:
         func (Callable): The function object to generate a hash for.
 
     Returns:
-        str: A hexadecimal SHA1 hash string representing the function's unique identifier.
+        str: A 16 character hexadecimal hash representing the function's unique identifier.
 
     Example:
         >>> def my_function():
         ...     pass
         >>> hash_id = hash_function_name(my_function)
-        >>> print(hash_id)  # e.g., "a3c65c2974270fd093ee8..."
+        >>> print(hash_id)  # e.g., "a3c65c2974270fd0"
     """
-    function_name = f"{func.__module__}.{func.__name__}"
-    return hashlib.sha1(f"{function_name}".encode()).hexdigest()
+    function_name = f"{func.__module__}.{func.__qualname__}"
+    return hashlib.blake2b(function_name.encode(), digest_size=8).hexdigest()
 
 
 def hash_function_args(args, kwargs) -> str:
     """
     Generate a unique hash identifier for function arguments.
 
-    This helper function creates a SHA1 hash of the function's arguments
-    (both positional and keyword arguments) by JSON-serializing them.
-    This allows the cache system to differentiate between different function
-    calls with different arguments.
+    This helper function creates a BLAKE2b hash of the function's arguments
+    (both positional and keyword arguments) from a canonical text form of
+    them, without a JSON round trip. This allows the cache system to
+    differentiate between different function calls with different arguments.
+
+    Besides JSON types, the canonical form supports tuples, sets, dicts with
+    non-string keys, bytes, Enums, dataclasses, datetime/date/time, UUIDs and
+    paths. Equal values always produce the same hash, regardless of dict or
+    set ordering.
 
     Args:
         args: Positional arguments passed to the function.
         kwargs: Keyword arguments passed to the function.
 
     Returns:
-        str: A hexadecimal SHA1 hash string representing the arguments' unique identifier.
+        str: A 32 character hexadecimal hash representing the arguments' unique identifier.
 
-    Note:
-        Arguments must be JSON-serializable. Non-serializable objects like
-        custom classes, datetime objects, or sets will cause this function to fail.
+    Raises:
+        TypeError: If an argument has an unsupported type, such as an arbitrary
+            class instance.
 
     Example:
         >>> hash_id = hash_function_args(("hello", 42), {"key": "value"})
         >>> print(hash_id)  # e.g., "b7c4d8f2a91e3..."
     """
-    encoded_args = f"{json.dumps(args, sort_keys=True)}-{json.dumps(kwargs, sort_keys=True)}"
-    return hashlib.sha1(f"{encoded_args}".encode()).hexdigest()
+    parts: List[str] = []
+    _canonicalize(tuple(args), parts)
+    for name in sorted(kwargs):
+        parts.append(f"{name}=")
+        _canonicalize(kwargs[name], parts)
+        parts.append(",")
+    return hashlib.blake2b("".join(parts).encode(), digest_size=16).hexdigest()
 
 
-def memoize(ttl_seconds: int):
+def memoize(
+    ttl_seconds: int,
+    max_memory_entries: int = 128,
+    coalesce: bool = True,
+    coalesce_timeout_seconds: Optional[float] = 60,
+    refresh_ahead: Optional[float] = None,
+    negative_ttl_seconds: Optional[int] = None,
+    negative_exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+    key: Optional[Callable[..., Any]] = None,
+    method: bool = False,
+    scope: str = "instance",
+    instance_key: Optional[Callable[[Any], Any]] = None,
+    key_args: Optional[Sequence[str]] = None,
+    prefix_args: Optional[Sequence[str]] = None,
+    tags: Optional[Union[Sequence[str], Callable[..., Iterable[str]]]] = None,
+    ttl_jitter: Optional[float] = None,
+    deterministic_jitter: bool = False,
+    max_entry_bytes: Optional[int] = None,
+    min_compute_ms: Optional[float] = None,
+):
     """
     Decorator factory for caching function results with time-to-live (TTL).
 
@@ -87,18 +645,111 @@ def memoize(ttl_seconds: int):
 
     The decorator uses a key-value store to persist cache across application
     restarts and creates unique cache keys based on the function name and arguments.
+    On top of it, each decorated function keeps a bounded in-memory cache, so
+    repeated calls in the same process are answered without opening SQLite.
+    Results read from the key-value store are promoted into the in-memory cache
+    with their remaining lifetime.
+
+    Concurrent calls with the same arguments are coalesced: while one thread
+    computes a missing result, other threads asking for the same key wait for
+    it instead of running the function again.
+
+    Coroutine functions (async def) are supported: the coroutine is awaited and
+    its result cached, KV reads and writes run in the event loop's default
+    executor so SQLite never blocks the loop, and concurrent awaiters of the
+    same key share one execution.
+
+    With refresh_ahead, entries that have lived past that fraction of their TTL
+    are still returned, but a background worker recomputes and replaces them,
+    so frequently used results never expire in front of a caller.
+
+    Every result is cached, including None and falsy values. With
+    negative_ttl_seconds, None results ("not found") are kept for that shorter
+    period instead, and exceptions are cached too and raised again on hits.
 
     Args:
         ttl_seconds (int): Time-to-live for cached results in seconds. After this
             period, the cache expires and the function will be executed again.
+        max_memory_entries (int): Maximum number of results kept in the in-memory
+            cache of this function. Least recently used entries are evicted first.
+            Set to 0 to disable the in-memory cache. Defaults to 128.
+        coalesce (bool): Whether concurrent calls with the same arguments should
+            share a single execution of the function. Defaults to True.
+        coalesce_timeout_seconds (Optional[float]): Maximum time a waiting caller
+            blocks on another thread's execution before running the function
+            itself. None waits forever. Defaults to 60.
+        refresh_ahead (Optional[float]): Fraction of the TTL, between 0 and 1,
+            after which a cache hit schedules a background recompute of the
+            entry. None disables refresh-ahead. Defaults to None.
+        negative_ttl_seconds (Optional[int]): Time-to-live for negative answers,
+            meaning None results and exceptions matching negative_exceptions.
+            None caches None results with ttl_seconds and never caches
+            exceptions. Defaults to None.
+        negative_exceptions (Tuple[Type[BaseException], ...]): Exception types
+            cached when negative_ttl_seconds is set. Defaults to (Exception,).
+        key (Optional[Callable[..., Any]]): Custom cache key builder. Called with
+            the same arguments as the decorated function, its return value is
+            hashed instead of the arguments. Useful when arguments are not
+            supported by the default key builder. Defaults to None.
+        method (bool): Set to True when decorating an instance method or a
+            classmethod. The receiver (self or cls) is left out of the hashed
+            arguments and replaced by the cache scope. Defaults to False.
+        scope (str): Cache scope for methods. "instance" keeps separate results
+            per instance, "class" shares results between all instances of the
+            receiver's class, only safe when results do not depend on instance
+            state. Classmethods always use the class scope. Defaults to "instance".
+        instance_key (Optional[Callable[[Any], Any]]): Builds the identity of an
+            instance for the "instance" scope, such as lambda self: self.account_id.
+            Without it, instances get a process-local identity, tracked without
+            modifying them, so their entries are not reused after a restart.
+            Instances that do not support weak references need it.
+            Defaults to None.
+        key_args (Optional[Sequence[str]]): Names of the parameters that take part
+            in the cache key. Other arguments, like API clients or callbacks, are
+            ignored. None uses all arguments. Defaults to None.
+        prefix_args (Optional[Sequence[str]]): Names of parameters whose values
+            are embedded in a prefix of the cache key, so invalidate() can delete
+            every entry for given values of them, like invalidate(func, user_id=42),
+            with a single range delete. Defaults to None.
+        tags (Optional[Union[Sequence[str], Callable[..., Iterable[str]]]]): Tags
+            attached to each entry, for invalidate_tag(). Either templates
+            formatted with the call's arguments, such as ["feed:{user_id}"], or a
+            callable receiving the same arguments as the function and returning
+            the tags. Defaults to None.
+        ttl_jitter (Optional[float]): Fraction of the TTL, between 0 and 1, by
+            which each entry's lifetime is randomly shortened, so entries written
+            together, for example by warm(), do not all expire at once. Applies
+            to negative_ttl_seconds too. Defaults to None (no jitter).
+        deterministic_jitter (bool): Derive the jitter from a hash of the cache
+            key instead of a random number, so an entry gets the same lifetime
+            every time it is recomputed. Defaults to False.
+        max_entry_bytes (Optional[int]): Results whose serialized form is larger
+            than this are returned without being cached, so a few huge payloads
+            cannot crowd kv.db or the memory cache. Defaults to None (no limit).
+        min_compute_ms (Optional[float]): Results computed faster than this are
+            returned without being cached, since reading them back would not
+            save time. Negative answers are always cached. Defaults to None.
+
+    Raises:
+        ValueError: If refresh_ahead or ttl_jitter is not between 0 and 1, scope
+            is unknown or key_args or prefix_args name a parameter the function
+            does not have.
 
     Returns:
         Callable: A decorator function that can be applied to any function.
 
     Note:
-        - Function arguments must be JSON-serializable for caching to work.
+        - Function arguments must be JSON types, tuples, sets, bytes, Enums,
+          dataclasses, datetimes, UUIDs or paths, unless key is given.
+        - Cached exceptions are rebuilt from their type and arguments. Types that
+          cannot be imported back are raised as RuntimeError.
         - Cached results are stored in a persistent KV store.
         - Each unique combination of arguments creates a separate cache entry.
+        - Results served from the in-memory cache are shared objects, avoid
+          mutating them.
+        - Results skipped by max_entry_bytes and min_compute_ms are counted in
+          stats() as rejected_too_large and rejected_too_cheap. When a refresh
+          result is skipped, the stale entry it would replace is deleted.
 
     Example:
         >>> from src.ut_components.memoize import memoize
@@ -120,23 +771,428 @@ def memoize(ttl_seconds: int):
         >>> result3 = expensive_api_call("user456", "/profile")
     """
 
+    if refresh_ahead is not None and not 0 < refresh_ahead < 1:
+        raise ValueError("refresh_ahead must be between 0 and 1")
+    if ttl_jitter is not None and not 0 <= ttl_jitter < 1:
+        raise ValueError("ttl_jitter must be between 0 and 1")
+    if scope not in ("class", "instance"):
+        raise ValueError(f"scope must be 'class' or 'instance', got {scope!r}")
+
     def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        for name in [*(key_args or ()), *(prefix_args or ())]:
+            if name not in signature.parameters:
+                raise ValueError(f"{func.__qualname__} has no parameter named {name!r}")
+
+        memory = _MemoryCache(max_memory_entries)
+        _MEMORY_CACHES.add(memory)
+        flights = _SingleFlight()
+        stats = _get_stats(f"{func.__module__}.{func.__qualname__}")
+
+        def entry_tags(args, kwargs) -> List[str]:
+            if tags is None:
+                return []
+            if callable(tags):
+                return list(tags(*args, **kwargs))
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return [tag.format(**bound.arguments) for tag in tags]
+
+        def store(
+            kv: KV,
+            key: str,
+            result: Any,
+            args,
+            kwargs,
+            compute_seconds: Optional[float] = None,
+            batch: bool = False,
+            replacing: bool = False,
+        ) -> bool:
+            def reject(reason: str) -> bool:
+                stats.count(reason)
+                # A stale entry left in place would be refreshed again on
+                # every hit, drop it so the next call is a plain miss.
+                if replacing:
+                    memory.delete_many([key])
+                    kv.delete(key)
+                return False
+
+            negative = isinstance(result, _CachedError) or (result is None and negative_ttl_seconds is not None)
+            if not negative and min_compute_ms is not None and compute_seconds is not None:
+                if compute_seconds * 1000 < min_compute_ms:
+                    return reject("rejected_too_cheap")
+            try:
+                encoded = kv.encode_value(_encode_result(result))
+            except TypeError as e:
+                warnings.warn(f"result of {func.__qualname__} is only cached in memory: {e}")
+                encoded = None
+            # encode_value() escapes non-ASCII characters, so the length of the
+            # text is its size in bytes.
+            if encoded is not None and max_entry_bytes is not None and len(encoded) > max_entry_bytes:
+                return reject("rejected_too_large")
+
+            entry_ttl_seconds = negative_ttl_seconds if negative else ttl_seconds
+            entry_ttl_seconds = jitter_ttl(entry_ttl_seconds, ttl_jitter, key if deterministic_jitter else None)
+            memory.put(key, result, _expires_at(entry_ttl_seconds))
+            # Tag rows are written even for results only cached in memory, so
+            # invalidate_tag() can still find and drop them.
+            for tag in entry_tags(args, kwargs):
+                kv.put_cached_encoded(_tag_prefix(tag) + key, "null", ttl_seconds=entry_ttl_seconds)
+            if encoded is not None:
+                kv.put_cached_encoded(key, encoded, ttl_seconds=entry_ttl_seconds)
+                stats.record_store(len(encoded))
+            if not batch:
+                kv.commit_cached()
+            return True
+
+        def compute(kv: KV, key: str, args, kwargs) -> Any:
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except negative_exceptions as e:
+                stats.record_compute(time.perf_counter() - started, failed=True)
+                if negative_ttl_seconds is not None:
+                    store(kv, key, _CachedError.from_exception(e), args, kwargs)
+                raise
+            compute_seconds = time.perf_counter() - started
+            stats.record_compute(compute_seconds)
+            store(kv, key, result, args, kwargs, compute_seconds)
+            return result
+
+        def respond(value: Any) -> Any:
+            if isinstance(value, _CachedError):
+                raise value.rebuild()
+            return value
+
+        def needs_refresh(expires_at: float, value: Any) -> bool:
+            if refresh_ahead is None or not ttl_seconds:
+                return False
+            if isinstance(value, _CachedError) or (value is None and negative_ttl_seconds is not None):
+                return False
+            return expires_at - time.time() < ttl_seconds * (1 - refresh_ahead)
+
+        def refresh(key: str, args, kwargs) -> None:
+            flight, leader = flights.join(key)
+            if not leader:
+                return
+
+            def run() -> None:
+                flight.owner = threading.get_ident()
+                stats.count("refreshes")
+                try:
+                    started = time.perf_counter()
+                    flight.result = func(*args, **kwargs)
+                    compute_seconds = time.perf_counter() - started
+                    with KV() as kv:
+                        store(kv, key, flight.result, args, kwargs, compute_seconds, replacing=True)
+                except Exception as e:
+                    flight.error = e
+                    traceback.print_exc()
+                finally:
+                    flights.leave(key, flight)
+
+            try:
+                _get_refresh_executor().submit(run)
+            except RuntimeError:
+                flights.leave(key, flight)
+
+        def promote(key: str, entry: Optional[Tuple[Any, Optional[int]]]) -> Optional[Tuple[float, Any]]:
+            if entry is None:
+                return None
+            try:
+                response = _decode_result(entry[0])
+            except Exception:
+                return None
+            expires_at = entry[1] if entry[1] is not None else math.inf
+            memory.put(key, response, expires_at)
+            return expires_at, response
+
+        def read(kv: KV, key: str) -> Optional[Tuple[float, Any]]:
+            started = time.perf_counter()
+            cached = promote(key, kv.get_entry(key))
+            stats.record_read(time.perf_counter() - started, hit=cached is not None)
+            return cached
+
+        def load(key: str, args, kwargs) -> Any:
+            cached = memory.get(key)
+            if cached is not None:
+                stats.count("memory_hits")
+                return respond(cached[1])
+
+            with KV() as kv:
+                cached = read(kv, key)
+                if cached is None:
+                    return compute(kv, key, args, kwargs)
+            if needs_refresh(cached[0], cached[1]):
+                refresh(key, args, kwargs)
+            return respond(cached[1])
+
+        def read_in_thread(key: str) -> Optional[Tuple[float, Any]]:
+            with KV() as kv:
+                return read(kv, key)
+
+        def store_in_thread(key: str, result: Any, args, kwargs, compute_seconds: Optional[float] = None) -> None:
+            with KV() as kv:
+                store(kv, key, result, args, kwargs, compute_seconds)
+
+        async_flights: Dict[Tuple[int, str], "asyncio.Future"] = {}
+        background_tasks: set = set()
+
+        def async_refresh(key: str, args, kwargs) -> None:
+            loop = asyncio.get_running_loop()
+            flight_key = (id(loop), key)
+            if flight_key in async_flights:
+                return
+            future = async_flights[flight_key] = loop.create_future()
+
+            async def run() -> None:
+                stats.count("refreshes")
+                try:
+                    started = time.perf_counter()
+                    result = await func(*args, **kwargs)
+                    compute_seconds = time.perf_counter() - started
+                    await loop.run_in_executor(None, store_in_thread, key, result, args, kwargs, compute_seconds)
+                    future.set_result(result)
+                except Exception as e:
+                    future.set_exception(e)
+                    future.exception()
+                    traceback.print_exc()
+                finally:
+                    async_flights.pop(flight_key, None)
+
+            task = loop.create_task(run())
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
+
+        async def async_load(key: str, args, kwargs) -> Any:
+            cached = memory.get(key)
+            if cached is not None:
+                stats.count("memory_hits")
+                return respond(cached[1])
+
+            loop = asyncio.get_running_loop()
+            cached = await loop.run_in_executor(None, read_in_thread, key)
+            if cached is not None:
+                if needs_refresh(cached[0], cached[1]):
+                    async_refresh(key, args, kwargs)
+                return respond(cached[1])
+
+            started = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except negative_exceptions as e:
+                stats.record_compute(time.perf_counter() - started, failed=True)
+                if negative_ttl_seconds is not None:
+                    await loop.run_in_executor(None, store_in_thread, key, _CachedError.from_exception(e), args, kwargs)
+                raise
+            compute_seconds = time.perf_counter() - started
+            stats.record_compute(compute_seconds)
+            await loop.run_in_executor(None, store_in_thread, key, result, args, kwargs, compute_seconds)
+            return result
+
+        prefix = f"memoize.{hash_function_name(func)}."
+
+        def args_prefix(values: Tuple) -> str:
+            return prefix + hash_function_args(values, {}) + "."
+
+        def build_key(args, kwargs) -> str:
+            entry_prefix = prefix
+            bound = None
+            if key_args is not None or prefix_args is not None:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+            if prefix_args is not None:
+                entry_prefix = args_prefix(tuple(bound.arguments[name] for name in prefix_args))
+            scoped: Tuple = ()
+            if method:
+                scoped = (_receiver_scope(args[0], scope, instance_key),)
+            if key is not None:
+                return entry_prefix + hash_function_args(scoped + (key(*args, **kwargs),), {})
+            if key_args is not None:
+                return entry_prefix + hash_function_args(scoped + tuple(bound.arguments[name] for name in key_args), {})
+            if method:
+                return entry_prefix + hash_function_args(scoped + tuple(args[1:]), kwargs)
+            return entry_prefix + hash_function_args(args, kwargs)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            hashed_function_name = hash_function_name(func)
-            hashed_encoded_args = hash_function_args(args, kwargs)
-            with KV() as kv:
-                response = kv.get(f"memoize.{hashed_function_name}.{hashed_encoded_args}")
-                if response is not None:
-                    return response
-                result = func(*args, **kwargs)
-                kv.put(
-                    f"memoize.{hashed_function_name}.{hashed_encoded_args}",
-                    result,
-                    ttl_seconds=ttl_seconds,
-                )
+            cache_key = build_key(args, kwargs)
+
+            cached = memory.get(cache_key)
+            if cached is not None:
+                stats.count("memory_hits")
+                if needs_refresh(cached[0], cached[1]):
+                    refresh(cache_key, args, kwargs)
+                return respond(cached[1])
+
+            if not coalesce:
+                return load(cache_key, args, kwargs)
+
+            flight, leader = flights.join(cache_key)
+            if not leader:
+                if flight.owner != threading.get_ident() and flight.done.wait(coalesce_timeout_seconds):
+                    stats.count("coalesced")
+                    return flight.get()
+                return load(cache_key, args, kwargs)
+
+            try:
+                flight.result = load(cache_key, args, kwargs)
+                return flight.result
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                flights.leave(cache_key, flight)
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs) -> Any:
+            cache_key = build_key(args, kwargs)
+
+            cached = memory.get(cache_key)
+            if cached is not None:
+                stats.count("memory_hits")
+                if needs_refresh(cached[0], cached[1]):
+                    async_refresh(cache_key, args, kwargs)
+                return respond(cached[1])
+
+            if not coalesce:
+                return await async_load(cache_key, args, kwargs)
+
+            loop = asyncio.get_running_loop()
+            flight_key = (id(loop), cache_key)
+            future = async_flights.get(flight_key)
+            if future is not None:
+                try:
+                    result = await asyncio.wait_for(asyncio.shield(future), coalesce_timeout_seconds)
+                    stats.count("coalesced")
+                    return result
+                except asyncio.TimeoutError:
+                    return await async_load(cache_key, args, kwargs)
+                except asyncio.CancelledError:
+                    if not future.cancelled():
+                        raise
+                    return await async_load(cache_key, args, kwargs)
+
+            future = async_flights[flight_key] = loop.create_future()
+            try:
+                result = await async_load(cache_key, args, kwargs)
+                future.set_result(result)
                 return result
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except BaseException as e:
+                future.set_exception(e)
+                future.exception()
+                raise
+            finally:
+                if async_flights.get(flight_key) is future:
+                    del async_flights[flight_key]
+
+        def warm_entries(calls: List[Tuple[tuple, Dict]], max_workers: int) -> int:
+            pending: Dict[str, Tuple[tuple, Dict]] = {}
+            stale = set()
+            for args, kwargs in calls:
+                cache_key = build_key(args, kwargs)
+                cached = memory.get(cache_key)
+                if cached is None or needs_refresh(cached[0], cached[1]):
+                    pending.setdefault(cache_key, (args, kwargs))
+                if cached is not None:
+                    stale.add(cache_key)
+            if not pending:
+                return 0
+
+            with KV() as kv:
+                entries = kv.get_entries(list(pending))
+            for cache_key, entry in entries.items():
+                cached = promote(cache_key, entry)
+                if cached is None:
+                    continue
+                if not needs_refresh(cached[0], cached[1]):
+                    del pending[cache_key]
+                else:
+                    stale.add(cache_key)
+
+            def run(cache_key: str, args, kwargs) -> Tuple[str, Any, Optional[_Flight], float]:
+                flight, leader = flights.join(cache_key)
+                if not leader:
+                    return cache_key, None, None, 0.0
+                started = time.perf_counter()
+                try:
+                    if inspect.iscoroutinefunction(func):
+                        flight.result = asyncio.run(func(*args, **kwargs))
+                    else:
+                        flight.result = func(*args, **kwargs)
+                    compute_seconds = time.perf_counter() - started
+                    stats.record_compute(compute_seconds)
+                    return cache_key, flight.result, flight, compute_seconds
+                except negative_exceptions as e:
+                    compute_seconds = time.perf_counter() - started
+                    stats.record_compute(compute_seconds, failed=True)
+                    flight.error = e
+                    if negative_ttl_seconds is not None:
+                        return cache_key, _CachedError.from_exception(e), flight, compute_seconds
+                    flights.leave(cache_key, flight)
+                    return cache_key, None, None, compute_seconds
+                except BaseException as e:
+                    flight.error = e
+                    flights.leave(cache_key, flight)
+                    raise
+
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="memoize-warm") as executor:
+                futures = [executor.submit(run, cache_key, *call) for cache_key, call in pending.items()]
 
+            # Every call has finished once the executor exits. Collect all
+            # outcomes before raising, so the flights of successful calls are
+            # still released and their results stored.
+            computed = []
+            error: Optional[BaseException] = None
+            for future in futures:
+                try:
+                    result = future.result()
+                except BaseException as e:
+                    error = error or e
+                    continue
+                if result[2] is not None:
+                    computed.append(result)
+
+            stored = 0
+            try:
+                with KV() as kv:
+                    for cache_key, result, _, compute_seconds in computed:
+                        stored += store(
+                            kv,
+                            cache_key,
+                            result,
+                            *pending[cache_key],
+                            compute_seconds,
+                            batch=True,
+                            replacing=cache_key in stale,
+                        )
+                    kv.commit_cached()
+            finally:
+                for cache_key, _, flight, _ in computed:
+                    flights.leave(cache_key, flight)
+            if error is not None:
+                raise error
+            return stored
+
+        def invalidate_entries(arguments: Dict[str, Any]) -> None:
+            if prefix_args is None:
+                raise ValueError(f"{func.__qualname__} is not memoized with prefix_args, use delete_memoized instead")
+            if set(arguments) != set(prefix_args):
+                raise ValueError(f"{func.__qualname__} is invalidated by exactly these arguments: {list(prefix_args)}")
+            entry_prefix = args_prefix(tuple(arguments[name] for name in prefix_args))
+            with KV() as kv:
+                kv.delete_prefix(entry_prefix)
+            memory.delete_prefix(entry_prefix)
+
+        for memoized in (wrapper, async_wrapper):
+            memoized.__memoize_warm__ = warm_entries  # type: ignore
+            memoized.__memoize_invalidate__ = invalidate_entries  # type: ignore
+
+        if inspect.iscoroutinefunction(func):
+            return async_wrapper
         return wrapper
 
     return decorator
@@ -151,8 +1207,9 @@ def delete_memoized(function: Callable):
     when you need to invalidate the cache for a function, such as after
     updating underlying data or when testing.
 
-    The function uses partial key deletion to remove all cache entries
-    that match the function's hashed name pattern.
+    The function uses a key prefix deletion to remove all cache entries
+    that match the function's hashed name pattern, in both the key-value
+    store and the in-memory cache.
 
     Args:
         function (Callable): The memoized function whose cache should be cleared.
@@ -178,7 +1235,9 @@ def delete_memoized(function: Callable):
     """
     hashed_function_name = hash_function_name(function)
     with KV() as kv:
-        kv.delete_partial(f"memoize.{hashed_function_name}")
+        kv.delete_prefix(f"memoize.{hashed_function_name}.")
+    for memory in list(_MEMORY_CACHES):
+        memory.delete_prefix(f"memoize.{hashed_function_name}.")
 
 
 def delete_all_memoized():
@@ -209,4 +1268,258 @@ def delete_all_memoized():
         >>> data3 = get_user_data("user123")  # Fetches from database
     """
     with KV() as kv:
-        kv.delete_partial("memoize")
+        kv.delete_prefix("memoize")
+    for memory in list(_MEMORY_CACHES):
+        memory.clear()
+
+
+def invalidate(function: Callable, **arguments: Any) -> None:
+    """
+    Delete the cached results of a memoized function for given argument values.
+
+    Only the entries whose prefix_args have the given values are removed, with
+    a single indexed range delete, instead of every result of the function
+    like delete_memoized() does.
+
+    Args:
+        function (Callable): A function decorated with @memoize and prefix_args.
+        **arguments: A value for every parameter listed in prefix_args.
+
+    Raises:
+        ValueError: If function is not memoized with prefix_args, or the
+            arguments do not match prefix_args.
+
+    Example:
+        >>> from src.ut_components.memoize import memoize, invalidate
+        >>>
+        >>> @memoize(ttl_seconds=3600, prefix_args=["user_id"])
+        >>> def get_posts(user_id: int, page: int = 1):
+        ...     return fetch_posts(user_id, page)
+        >>>
+        >>> get_posts(42, page=1)
+        >>> get_posts(42, page=2)
+        >>> get_posts(7)
+        >>>
+        >>> # Drops both pages of user 42, user 7 stays cached
+        >>> invalidate(get_posts, user_id=42)
+    """
+    invalidate_entries = getattr(function, "__memoize_invalidate__", None)
+    if invalidate_entries is None:
+        raise ValueError(f"{function.__qualname__} is not decorated with @memoize")
+    invalidate_entries(arguments)
+
+
+def invalidate_tag(tag: str) -> None:
+    """
+    Delete every cached result carrying a tag, across all memoized functions.
+
+    Entries get tags through the tags parameter of @memoize. The tag index is
+    kept in the KV store, so entries written by earlier runs of the app are
+    removed too.
+
+    Args:
+        tag (str): The tag to invalidate.
+
+    Example:
+        >>> from src.ut_components.memoize import memoize, invalidate_tag
+        >>>
+        >>> @memoize(ttl_seconds=3600, tags=["feed:{user_id}"])
+        >>> def get_feed(user_id: int, page: int = 1):
+        ...     return fetch_feed(user_id, page)
+        >>>
+        >>> @memoize(ttl_seconds=3600, tags=lambda post: [f"feed:{post['author_id']}"])
+        >>> def render_post(post: dict):
+        ...     return render(post)
+        >>>
+        >>> # After user 42 publishes a post
+        >>> invalidate_tag("feed:42")
+    """
+    tag_prefix = _tag_prefix(tag)
+    with KV() as kv:
+        keys = [tag_key[len(tag_prefix) :] for tag_key in kv.get_prefix_keys(tag_prefix)]
+        kv.delete_many(keys)
+        kv.delete_prefix(tag_prefix)
+    for cache in list(_MEMORY_CACHES):
+        cache.delete_many(keys)
+
+
+def _call_arguments(item: Any) -> Tuple[tuple, Dict]:
+    if isinstance(item, tuple):
+        return item, {}
+    if isinstance(item, dict):
+        return (), item
+    return (item,), {}
+
+
+def warm(function: Callable, arg_list: List[Any], max_workers: int = 4) -> int:
+    """
+    Compute missing cache entries of a memoized function ahead of time.
+
+    Checks which of the given calls are not cached yet, or are due for a
+    refresh, computes them concurrently on a thread pool and writes all of
+    them to the KV store in a single transaction. Calls that are already
+    cached and fresh are skipped, and calls that are being computed by
+    another thread at the same time are left to that thread.
+
+    Args:
+        function (Callable): A function decorated with @memoize.
+        arg_list (List[Any]): The calls to warm. Each item is a tuple of
+            positional arguments, a dict of keyword arguments, or a single
+            positional argument.
+        max_workers (int): Maximum number of calls computed at the same time.
+            Defaults to 4.
+
+    Returns:
+        int: The number of entries that were computed and stored. Results
+            rejected by max_entry_bytes or min_compute_ms are not counted.
+
+    Raises:
+        ValueError: If function is not decorated with @memoize.
+
+    Example:
+        >>> from src.ut_components.memoize import memoize, warm
+        >>>
+        >>> @memoize(ttl_seconds=3600)
+        >>> def get_album(album_id: str, with_assets: bool = False):
+        ...     return fetch_album(album_id, with_assets)
+        >>>
+        >>> warm(get_album, ["a1", "a2", ("a3", True), {"album_id": "a4"}], max_workers=8)
+    """
+    warm_entries = getattr(function, "__memoize_warm__", None)
+    if warm_entries is None:
+        raise ValueError(f"{function.__qualname__} is not decorated with @memoize")
+    return warm_entries([_call_arguments(item) for item in arg_list], max_workers)
+
+
+def schedule_warm(
+    function: Callable,
+    arg_list: List[Any],
+    max_workers: int = 4,
+    event_id: Optional[str] = None,
+    execution_interval: Optional[timedelta] = None,
+) -> str:
+    """
+    Warm a memoized function from the event dispatcher thread.
+
+    Registers an event that runs warm() and schedules it once, so warm-up
+    happens in the background, for example at startup before the user
+    navigates. When the event runs, {"warmed": count} is sent to QML with
+    the event id as the signal name. The dispatcher must be started for the
+    event to run.
+
+    Args:
+        function (Callable): A function decorated with @memoize.
+        arg_list (List[Any]): The calls to warm, as accepted by warm().
+        max_workers (int): Maximum number of calls computed at the same time.
+            Defaults to 4.
+        event_id (Optional[str]): Event id, and signal name in QML. Defaults to
+            "memoize-warm." followed by the function's qualified name.
+        execution_interval (Optional[timedelta]): Delay before warming starts.
+            None warms on the next dispatcher iteration. Defaults to None.
+
+    Returns:
+        str: The registered event id.
+
+    Raises:
+        ValueError: If function is not decorated with @memoize.
+
+    Example:
+        >>> from src.ut_components.event import get_event_dispatcher
+        >>> from src.ut_components.memoize import schedule_warm
+        >>>
+        >>> schedule_warm(get_album, recent_album_ids, max_workers=8)
+        >>> get_event_dispatcher().start()
+    """
+    from .event import get_event_dispatcher
+
+    if getattr(function, "__memoize_warm__", None) is None:
+        raise ValueError(f"{function.__qualname__} is not decorated with @memoize")
+    event_id = event_id or f"memoize-warm.{function.__qualname__}"
+    dispatcher = get_event_dispatcher()
+    dispatcher.register_event(
+        _function_event(event_id, lambda: {"warmed": warm(function, arg_list, max_workers=max_workers)})
+    )
+    dispatcher.schedule(event_id, execution_interval=execution_interval)
+    return event_id
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get hit, miss and latency statistics of every memoized function.
+
+    Each memoized function records how often it was answered from the
+    in-memory cache, from the KV store or by running the function, how long
+    computing and reading took, and how large the stored results are. Use it
+    to tune ttl_seconds and to spot functions that are not worth memoizing,
+    such as ones with a low hit ratio or a compute time close to the read time.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Statistics keyed by the function's module
+        and qualified name. Each value contains the counters memory_hits,
+        kv_hits, misses, coalesced, refreshes, errors and stored_entries, the
+        hit_ratio, byte counters stored_bytes and largest_entry_bytes, total
+        compute_seconds and read_seconds with their averages in milliseconds,
+        and compute_latency_ms / read_latency_ms histograms mapping bucket
+        labels like "<=10ms" to call counts.
+
+    Example:
+        >>> from src.ut_components.memoize import memoize, stats
+        >>>
+        >>> @memoize(ttl_seconds=3600)
+        >>> def get_user_data(user_id: str):
+        ...     return fetch_from_database(user_id)
+        >>>
+        >>> get_user_data("user123")
+        >>> get_user_data("user123")
+        >>> print(stats()["myapp.users.get_user_data"]["hit_ratio"])  # 0.5
+    """
+    with _STATS_LOCK:
+        items = list(_STATS.items())
+    return {name: function_stats.as_dict() for name, function_stats in items}
+
+
+def reset_stats():
+    """
+    Reset the statistics of every memoized function to zero.
+
+    Example:
+        >>> from src.ut_components.memoize import reset_stats, stats
+        >>>
+        >>> reset_stats()
+        >>> run_benchmark()
+        >>> print(stats())
+    """
+    with _STATS_LOCK:
+        for name in _STATS:
+            _STATS[name] = _Stats()
+
+
+def publish_stats(event_id: str = "memoize-stats", execution_interval: timedelta = timedelta(seconds=30)) -> str:
+    """
+    Periodically send memoize statistics to QML through the event dispatcher.
+
+    Registers an event that returns stats() on every execution, so the
+    dispatcher sends it to QML with the event id as the signal name. The
+    dispatcher must be started for the event to run.
+
+    Args:
+        event_id (str): Event id, and signal name in QML. Defaults to "memoize-stats".
+        execution_interval (timedelta): How often statistics are sent.
+            Defaults to 30 seconds.
+
+    Returns:
+        str: The registered event id.
+
+    Example:
+        >>> from src.ut_components.event import get_event_dispatcher
+        >>> from src.ut_components.memoize import publish_stats
+        >>>
+        >>> publish_stats()
+        >>> get_event_dispatcher().start()
+        >>>
+        >>> # In QML:
+        >>> # python.setHandler("memoize-stats", function(stats) { console.log(JSON.stringify(stats)) })
+    """
+    from .event import get_event_dispatcher
+
+    return get_event_dispatcher().register_event(_function_event(event_id, stats, execution_interval))